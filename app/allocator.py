@@ -0,0 +1,173 @@
+from uuid import UUID, uuid4
+from typing import Dict, List
+from random import SystemRandom
+
+from tortoise.expressions import F
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.models import Lottery, Ticket
+from app.exceptions import NoTicketsLeftException
+
+
+cryptogen = SystemRandom()
+
+# insert tickets in one round-trip, ticket numbers which were taken by a concurrent purchase are skipped
+# (instead of aborting the whole transaction with IntegrityError) and only inserted numbers are returned
+INSERT_TICKETS_SQL = """
+INSERT INTO "ticket" ("id", "user_id", "ticket_number", "lottery_id")
+SELECT "t"."id", "t"."user_id", "t"."ticket_number", $4::uuid
+FROM unnest($1::uuid[], $2::bigint[], $3::bigint[]) AS "t" ("id", "user_id", "ticket_number")
+ON CONFLICT ("ticket_number", "lottery_id") DO NOTHING
+RETURNING "ticket_number"
+"""
+
+
+class TicketNumberPool:
+    """Pool of free ticket numbers for a single lottery
+
+    Works as a lazy Fisher-Yates shuffle over the inclusive range of ticket numbers: the range is treated as
+    an array of slots where only displaced slots are stored, this way taking a random free number is O(1)
+    and memory usage depends on the number of sold tickets instead of the width of the range
+    """
+
+    def __init__(self, min_number: int, max_number: int):
+        self.min_number = min_number
+        # make range to behave as inclusive range, this way ticket with max_number could be won
+        self.size = max_number + 1 - min_number
+        self._slots: Dict[int, int] = {}  # slot -> ticket number (only for displaced numbers)
+        self._positions: Dict[int, int] = {}  # ticket number -> slot (only for displaced numbers)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, number: int) -> bool:
+        slot = self._positions.get(number, number - self.min_number)
+        return 0 <= slot < self.size and self._number_at(slot) == number
+
+    def _number_at(self, slot: int) -> int:
+        return self._slots.get(slot, self.min_number + slot)
+
+    def _forget(self, slot: int, number: int) -> None:
+        self._slots.pop(slot, None)
+        self._positions.pop(number, None)
+
+    def _place(self, number: int, slot: int) -> None:
+        if number - self.min_number != slot:
+            self._slots[slot] = number
+            self._positions[number] = slot
+
+    def _take_slot(self, slot: int) -> int:
+        number = self._number_at(slot)
+        last_slot = self.size - 1
+        last_number = self._number_at(last_slot)
+        self._forget(slot, number)
+        self._forget(last_slot, last_number)
+        # fill the gap with the number from the last slot, so free numbers are always in [0, size)
+        if slot != last_slot:
+            self._place(last_number, slot)
+        self.size -= 1
+        return number
+
+    def take(self) -> int:
+        """Take random free ticket number
+
+        Raises: NoTicketsLeftException if all ticket numbers were taken
+        """
+        if not self.size:
+            raise NoTicketsLeftException()
+        return self._take_slot(cryptogen.randrange(self.size))
+
+    def take_many(self, count: int) -> List[int]:
+        """Take `count` distinct random free ticket numbers
+
+        Raises: NoTicketsLeftException if there is not enough free ticket numbers (nothing is taken)
+        """
+        if count > self.size:
+            raise NoTicketsLeftException()
+        return [self.take() for _ in range(count)]
+
+    def discard(self, number: int) -> bool:
+        """Mark ticket number as taken, returns False if it wasn't free"""
+        if number not in self:
+            return False
+        self._take_slot(self._positions.get(number, number - self.min_number))
+        return True
+
+    def release(self, number: int) -> None:
+        """Return previously taken ticket number to the pool (e.g. when transaction was rolled back)"""
+        if number in self:
+            return
+        self._place(number, self.size)
+        self.size += 1
+
+
+# pools are built once per lottery (when the bot starts or on the first purchase) and then kept in sync in memory
+_pools: Dict[UUID, TicketNumberPool] = {}
+
+
+async def get_ticket_pool(lottery: Lottery) -> TicketNumberPool:
+    """Return pool of free ticket numbers for lottery, rebuild it from database if needed"""
+    pool = _pools.get(lottery.id)
+    if pool is not None:
+        return pool
+    ticket_numbers = await Ticket.filter(lottery_id=lottery.id).values_list("ticket_number", flat=True)
+    pool = TicketNumberPool(lottery.ticket_min_number, lottery.ticket_max_number)
+    for ticket_number in ticket_numbers:
+        pool.discard(ticket_number)
+    # pool could have been built by another coroutine while we were waiting for the database
+    return _pools.setdefault(lottery.id, pool)
+
+
+def drop_ticket_pool(lottery_id: UUID) -> None:
+    """Free memory used by pool when lottery stopped selling tickets"""
+    _pools.pop(lottery_id, None)
+
+
+async def create_tickets(connection: BaseDBAsyncClient, lottery: Lottery, owner_ids: List[int]) -> List[Ticket]:
+    """Create one ticket with random free number for each owner id
+
+    If ticket number was already taken in database (e.g. pool was outdated) we will retry with another number,
+    so callers never get IntegrityError from `unique_together = ("ticket_number", "lottery")`
+
+    Raises: NoTicketsLeftException if there is not enough free ticket numbers (transaction should be rolled back)
+
+    Note: if caller's transaction fails after tickets were created, numbers stay taken in the pool,
+    so caller should drop the pool via `drop_ticket_pool` (it will be rebuilt from database)
+    """
+    pool = await get_ticket_pool(lottery)
+    tickets = []
+    taken_numbers = []
+    conflicted_numbers = set()
+    pending_owner_ids = list(owner_ids)
+    try:
+        while pending_owner_ids:
+            ticket_numbers = pool.take_many(len(pending_owner_ids))
+            taken_numbers.extend(ticket_numbers)
+            ticket_ids = [uuid4() for _ in ticket_numbers]
+            rows = await connection.execute_query_dict(
+                INSERT_TICKETS_SQL, [ticket_ids, pending_owner_ids, ticket_numbers, lottery.id]
+            )
+            inserted = {row["ticket_number"] for row in rows}
+            retry_owner_ids = []
+            for ticket_id, owner_id, ticket_number in zip(ticket_ids, pending_owner_ids, ticket_numbers):
+                if ticket_number in inserted:
+                    tickets.append(
+                        Ticket(id=ticket_id, user_id=owner_id, lottery_id=lottery.id, ticket_number=ticket_number)
+                    )
+                else:
+                    # number is already used in database, it stays taken in the pool and we retry with another one
+                    conflicted_numbers.add(ticket_number)
+                    retry_owner_ids.append(owner_id)
+            pending_owner_ids = retry_owner_ids
+        # keep denormalised counters in sync with tickets
+        await Lottery.filter(id=lottery.id).using_db(connection).update(
+            tickets_sold=F("tickets_sold") + len(tickets),
+            pool_total=F("pool_total") + lottery.ticket_price * len(tickets),
+        )
+    except Exception:
+        # caller should roll back the transaction, so our numbers become free again
+        for ticket_number in taken_numbers:
+            if ticket_number not in conflicted_numbers:
+                pool.release(ticket_number)
+        raise
+    return tickets
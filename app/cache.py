@@ -0,0 +1,67 @@
+import time
+from uuid import UUID
+from typing import Dict, Optional, Tuple
+
+from app.models import Lottery
+from app.constants import LOTTERY_CACHE_TTL
+
+
+class LotteryCache:
+    """Process-local read-through cache of lotteries by name and id
+
+    Lotteries change rarely (they are created once and then their status is changed by the cron), so entries live
+    for `ttl` seconds and every write to lottery should invalidate it explicitly
+    """
+
+    def __init__(self, ttl: float = LOTTERY_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lotteries: Dict[UUID, Tuple[float, Lottery]] = {}  # id -> (expires at, lottery)
+        self._ids: Dict[str, UUID] = {}  # name -> id
+
+    def __len__(self) -> int:
+        return len(self._lotteries)
+
+    def _get(self, lottery_id: Optional[UUID]) -> Optional[Lottery]:
+        expires_at, lottery = self._lotteries.get(lottery_id, (0, None))
+        if lottery is None or expires_at < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return lottery
+
+    def _set(self, lottery: Optional[Lottery]) -> Optional[Lottery]:
+        if lottery is not None:
+            self._lotteries[lottery.id] = (time.monotonic() + self.ttl, lottery)
+            self._ids[lottery.name] = lottery.id
+        return lottery
+
+    async def get_by_name(self, name: str) -> Optional[Lottery]:
+        lottery = self._get(self._ids.get(name))
+        if lottery is None:
+            lottery = self._set(await Lottery.get_or_none(name=name))
+        return lottery
+
+    async def get_by_id(self, lottery_id: UUID) -> Optional[Lottery]:
+        lottery = self._get(lottery_id)
+        if lottery is None:
+            lottery = self._set(await Lottery.get_or_none(id=lottery_id))
+        return lottery
+
+    def invalidate(self, *lottery_ids: UUID) -> None:
+        """Remove lotteries from cache (should be called after lottery was changed)"""
+        for lottery_id in lottery_ids:
+            _, lottery = self._lotteries.pop(lottery_id, (0, None))
+            if lottery is not None:
+                self._ids.pop(lottery.name, None)
+
+    def clear(self) -> None:
+        self._lotteries.clear()
+        self._ids.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses}
+
+
+lottery_cache = LotteryCache()
@@ -9,8 +9,19 @@ class LotteryStatus(str, Enum):
 
 
 STOP_SALES_BEFORE_START_IN_SEC = 60 * 60 * 2  # in seconds
+LATEST_VRF_VERSION = 2  # version of winning tickets selection algorithm used for new lotteries (see README)
 BLOCK_CONFIRMATIONS = 12  # number of block confirmations after which block will be considered as canonical
+AVERAGE_BLOCK_TIME_SECONDS = 12  # used to estimate ETA to block from the current chain tip
 DELETE_AFTER = 60 * 10  # the number of seconds to wait in the background before deleting the message
+MAX_TICKETS_PER_PURCHASE = 100  # max number of tickets which could be bought via single command
+REGISTERED_USERS_CACHE_SIZE = 10_000  # max number of user ids remembered as registered
+LOTTERY_CACHE_TTL = 60  # in seconds, how long lotteries are cached in memory
+NUMBER_OF_SUGGESTIONS = 10  # max number of sweepstake names suggested when typed name is ambiguous
+MAX_CONCURRENT_LOTTERIES = 5  # max number of lotteries which statuses are handled concurrently
+NOTIFICATIONS_BATCH_SIZE = 10  # max number of outbox notifications delivered per batch
+NOTIFICATION_MAX_ATTEMPTS = 5  # notification is dropped after this number of failed deliveries
+HISTORY_PAGE_SIZE = 10  # number of sweepstake results displayed per page of history
+STATS_TOP_COMMANDS = 5  # number of commands with the most database time displayed in stats
 
 GREEN = 0x03D692
 GOLD = 0xF1C40F
@@ -0,0 +1,146 @@
+import time
+import asyncio
+from typing import Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+
+import config
+from app.constants import AVERAGE_BLOCK_TIME_SECONDS, BLOCK_CONFIRMATIONS
+from app.exceptions import BlockAlreadyMinedException
+
+
+class TokenBucket:
+    """Token bucket rate limiter, `rate` tokens are added every second up to `capacity` tokens"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EtherscanClient:
+    """Etherscan API client
+
+    All requests share single long-lived HTTP session, so connections (DNS, TCP and TLS setup) are reused between
+    cron ticks and commands. Session is opened on bot startup and closed on shutdown.
+    Requests are throttled by token bucket to stay within API rate limits, identical concurrent requests
+    share single HTTP call
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = config.ETHERSCAN_API_URL,
+        timeout: float = config.ETHERSCAN_TIMEOUT_SECONDS,
+        rate_limit: float = config.ETHERSCAN_RATE_LIMIT,
+        keepalive_timeout: float = 60,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._rate_limiter = TokenBucket(rate_limit)
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+
+    async def start(self) -> None:
+        """Open HTTP session"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(keepalive_timeout=self.keepalive_timeout),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                raise_for_status=True,
+            )
+
+    async def close(self) -> None:
+        """Close HTTP session and all its connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _fetch(self, params: dict) -> dict:
+        # open session lazily, this way client could be used from scripts without explicit start
+        await self.start()
+        await self._rate_limiter.acquire()
+        async with self._session.get(self.base_url, params={**params, "apikey": self.api_key}) as response:
+            return await response.json()
+
+    async def _request(self, **params) -> dict:
+        key = tuple(sorted(params.items()))
+        future = self._in_flight.get(key)
+        if future is None:
+            # nobody is waiting for the same response, make new HTTP call
+            future = asyncio.ensure_future(self._fetch(params))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # cancellation of one caller shouldn't cancel HTTP call for other callers
+        return await asyncio.shield(future)
+
+    async def get_block_number(self) -> int:
+        """Get number of the most recent block"""
+        response_json = await self._request(module="proxy", action="eth_blockNumber")
+        return int(response_json["result"], 16)
+
+    async def get_hash_for_block(self, block: int) -> str:
+        """Get block hash for block
+
+        Returns:
+            block hash
+        """
+        block_info = await self._request(module="proxy", action="eth_getBlockByNumber", tag=hex(block), boolean="true")
+        return block_info["result"]["hash"]
+
+
+class BlockHeight:
+    """Cached height of the chain tip
+
+    Head is fetched at most once per `ttl` seconds, all questions about other blocks (is block confirmed, ETA to block)
+    are answered locally from the head height and average block time
+    """
+
+    def __init__(self, client: EtherscanClient, ttl: float = AVERAGE_BLOCK_TIME_SECONDS):
+        self.client = client
+        self.ttl = ttl
+        self._head: Optional[int] = None
+        self._fetched_at = 0.0
+
+    async def get_head(self) -> int:
+        """Get number of the most recent block"""
+        if self._head is None or time.monotonic() - self._fetched_at >= self.ttl:
+            self._head = await self.client.get_block_number()
+            self._fetched_at = time.monotonic()
+        return self._head
+
+    async def is_confirmed(self, block: int, confirmations: int = BLOCK_CONFIRMATIONS) -> bool:
+        """Check if block was mined and has required number of confirmations (aka block depth)"""
+        return await self.get_head() >= block + confirmations
+
+    async def get_eta_to_block(self, block: int) -> datetime:
+        """Get ETA to block
+
+        Raises: BlockAlreadyMinedException if block already passed
+        """
+        head = await self.get_head()
+        if block <= head:
+            raise BlockAlreadyMinedException()
+        eta_in_seconds = (block - head) * AVERAGE_BLOCK_TIME_SECONDS
+        return datetime.now(tz=timezone.utc) + timedelta(seconds=eta_in_seconds)
+
+
+etherscan = EtherscanClient(config.ETHERSCAN_API_KEY)
+block_height = BlockHeight(etherscan)
@@ -1,2 +1,10 @@
 class BlockAlreadyMinedException(Exception):
     pass
+
+
+class NoTicketsLeftException(Exception):
+    pass
+
+
+class ChannelNotAvailableException(Exception):
+    pass
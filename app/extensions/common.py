@@ -1,10 +1,51 @@
+from discord import Embed
+from discord.utils import find
 from discord.ext import commands
+from discord_slash import cog_ext, SlashContext
+
+import config
+from app.cache import lottery_cache
+from app.instrumentation import total_stats, get_top_commands
+from app.constants import GREEN, DELETE_AFTER, STATS_TOP_COMMANDS
 
 
 class CommonCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    @cog_ext.cog_subcommand(
+        base="sweepstake_admin",
+        name="stats",
+        guild_ids=config.GUILD_IDS,
+        description="Display bot internals for monitoring (admins only)",
+    )
+    async def stats(self, ctx: SlashContext):
+        can_control_bot = find(lambda _: _.name in config.ROLES_CAN_CONTROL_BOT, ctx.author.roles)
+        if not can_control_bot:
+            return await ctx.send(
+                f"{ctx.author.mention}, I’m sorry but I can’t do that for you.", delete_after=DELETE_AFTER
+            )
+        widget = Embed(description="Bot internals", color=GREEN, title="Stats")
+        widget.set_thumbnail(url=config.PROJECT_THUMBNAIL)
+        cache_stats = lottery_cache.stats()
+        widget.add_field(
+            name="Sweepstake cache:",
+            value=f"size: `{cache_stats['size']}`, hits: `{cache_stats['hits']}`, misses: `{cache_stats['misses']}`",
+            inline=False,
+        )
+        widget.add_field(
+            name="Database:",
+            value=f"queries: `{total_stats.queries}`, time: `{total_stats.db_time:.1f}` s",
+            inline=False,
+        )
+        top_commands = []
+        for name, stats in get_top_commands(STATS_TOP_COMMANDS):
+            queries_per_call = stats.queries / stats.calls
+            ms_per_call = stats.db_time * 1000 / stats.calls
+            top_commands.append(f"`{name}`: `{queries_per_call:.1f}` queries, `{ms_per_call:.1f}` ms per call")
+        widget.add_field(name="Slowest commands:", value="\n".join(top_commands) or "-", inline=False)
+        await ctx.send(content=ctx.author.mention, embed=widget, delete_after=DELETE_AFTER)
+
 
 def setup(bot):
     bot.add_cog(CommonCog(bot))
@@ -1,12 +1,14 @@
 import logging
 import asyncio
+from uuid import UUID
+from datetime import timedelta
+from collections import defaultdict
+from typing import List, Optional, Set
 
 from discord import Embed
 from discord.utils import find
-from discord.ext import commands, tasks
-from tortoise.expressions import F
+from discord.ext import commands
 from tortoise.query_utils import Q
-from tortoise.functions import Count
 from tortoise import exceptions, timezone
 from sentry_sdk import capture_exception, Hub
 from tortoise.transactions import in_transaction
@@ -15,30 +17,46 @@ from discord_slash.utils.manage_commands import create_option
 from discord_slash.model import SlashCommandOptionType
 
 import config
-from app.models import Lottery, User
+from app.models import Lottery, LotteryResult, BlockHash
+from app.cache import lottery_cache
+from app.names import lottery_names
+from app.allocator import drop_ticket_pool
 from app.exceptions import BlockAlreadyMinedException
+from app.etherscan import block_height
+from app.outbox import enqueue_notification, wake_dispatcher
+from app.scheduler import LotteryScheduler, get_lottery_deadline
 from app.utils import (
-    get_eta_to_block,
-    select_winning_tickets,
-    select_winning_tickets_guaranteed,
+    SELECT_WINNING_TICKETS,
+    select_winning_tickets_for_guaranteed_lottery,
     get_hash_for_block,
     pp_points,
     get_old_winning_pool,
-    register_view_lottery_command,
-    reload_options_hack,
+    get_winning_tickets,
+    credit_balances,
+    reconcile_lottery_counters,
+    resolve_lottery_name,
+)
+from app.constants import (
+    LotteryStatus,
+    STOP_SALES_BEFORE_START_IN_SEC,
+    GREEN,
+    GOLD,
+    DELETE_AFTER,
+    HISTORY_PAGE_SIZE,
+    MAX_CONCURRENT_LOTTERIES,
 )
-from app.constants import LotteryStatus, STOP_SALES_BEFORE_START_IN_SEC, BLOCK_CONFIRMATIONS, GREEN, GOLD, DELETE_AFTER
 
 
 class LotteryCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.lock = asyncio.Lock()
-        self.lottery_status_cron_job.start()
-        self.bot.loop.create_task(register_view_lottery_command(self.bot, self.view_lottery))
+        self.scheduler = LotteryScheduler()
+        # lotteries which failed during the last run, they are retried after CHECK_LOTTERY_STATUS_SECONDS
+        self.failed_lottery_ids: Set[UUID] = set()
+        self.lottery_status_task = bot.loop.create_task(self.lottery_status_job())
 
     def cog_unload(self):
-        self.lottery_status_cron_job.cancel()
+        self.lottery_status_task.cancel()
 
     @cog_ext.cog_slash(
         name="new_sweepstake",
@@ -124,7 +142,7 @@ class LotteryCog(commands.Cog):
             )
         # get eta to block
         try:
-            lottery.strike_date_eta = await get_eta_to_block(eth_block)
+            lottery.strike_date_eta = await block_height.get_eta_to_block(eth_block)
         except BlockAlreadyMinedException:
             # block has already passed
             return await ctx.send(
@@ -134,6 +152,7 @@ class LotteryCog(commands.Cog):
         # save lottery
         try:
             await lottery.save()
+            lottery_cache.invalidate(lottery.id)
         except exceptions.IntegrityError:
             return await ctx.send(
                 f"{ctx.author.mention}, error, sweepstake `{name}` already exists, choose a different name",
@@ -142,15 +161,30 @@ class LotteryCog(commands.Cog):
         await ctx.send(
             f"{ctx.author.mention}, success! Created sweepstake `{lottery}`, will strike at {lottery.strike_date_eta:%Y-%m-%d %H:%M} UTC"  # noqa: E501
         )
-        await reload_options_hack(ctx.bot)
+        lottery_names.add(lottery.name)
+        self.scheduler.schedule(
+            lottery.id, get_lottery_deadline(lottery, retry_after=config.CHECK_LOTTERY_STATUS_SECONDS)
+        )
 
+    @cog_ext.cog_subcommand(
+        base="sweepstake",
+        name="view",
+        guild_ids=config.GUILD_IDS,
+        description="Display sweepstake information",
+        options=[
+            create_option(
+                name="name",
+                description="Sweepstake name (or its beginning)",
+                option_type=SlashCommandOptionType.STRING,
+                required=True,
+            ),
+        ],
+    )
     async def view_lottery(self, ctx: SlashContext, name: str):
-        lottery = (
-            await Lottery.all()
-            .prefetch_related("tickets")
-            .annotate(total_tickets=Count("tickets"))
-            .get_or_none(name=name)
-        )
+        name = await resolve_lottery_name(ctx, name)
+        if not name:
+            return
+        lottery = await lottery_cache.get_by_name(name)
         if not lottery:
             return await ctx.send(
                 f"{ctx.author.mention}, error, sweepstake `{name}` doesn't exist", delete_after=DELETE_AFTER
@@ -171,15 +205,11 @@ class LotteryCog(commands.Cog):
             value=f"[{lottery.strike_date_eta:%Y-%m-%d %H:%M} UTC](<https://etherscan.io/block/countdown/{lottery.strike_eth_block}>)",  # noqa: E501
             inline=False,
         )
-        widget.add_field(
-            name="Tickets left:", value=f"{lottery.possible_tickets_count - lottery.total_tickets}", inline=False
-        )
+        widget.add_field(name="Tickets left:", value=f"{lottery.tickets_left}", inline=False)
         if lottery.status in [LotteryStatus.STARTED, LotteryStatus.STOP_SALES]:
-            # get winning pool for the current lottery
-            lottery_pool = lottery.total_tickets * lottery.ticket_price
             # get old winning pool
             old_winning_pool = await get_old_winning_pool()
-            total_winning_pool = old_winning_pool + lottery_pool
+            total_winning_pool = old_winning_pool + lottery.pool_total
             widget.add_field(
                 name="Expected reward to win:",
                 value=f"{pp_points(total_winning_pool)}{config.POINTS_EMOJI}",
@@ -214,29 +244,60 @@ class LotteryCog(commands.Cog):
         name="history",
         guild_ids=config.GUILD_IDS,
         description="Display results for previous lotteries",
+        options=[
+            create_option(
+                name="page",
+                description="Page of results, starting from the most recent (default 1)",
+                option_type=SlashCommandOptionType.INTEGER,
+                required=False,
+            ),
+        ],
     )
-    async def history(self, ctx: SlashContext):
-        lotteries_ended = (
-            await Lottery.filter(status=LotteryStatus.ENDED)
-            .prefetch_related("tickets")
+    async def history(self, ctx: SlashContext, page: int = 1):
+        if page < 1:
+            return await ctx.send(
+                f"{ctx.author.mention}, error, `page` should be greater or equal than 1", delete_after=DELETE_AFTER
+            )
+        results = (
+            await LotteryResult.all()
+            .prefetch_related("lottery")
             .order_by("-created_at")
-            .limit(10)
+            .offset((page - 1) * HISTORY_PAGE_SIZE)
+            .limit(HISTORY_PAGE_SIZE)
         )
-        if not lotteries_ended:
+        if not results:
             return await ctx.send(f"{ctx.author.mention}, we don't have any past lotteries", delete_after=DELETE_AFTER)
-        widget = Embed(description="Results for last 10 lotteries", color=GREEN, title="History of lotteries")
+        widget = Embed(description=f"Results for lotteries, page {page}", color=GREEN, title="History of lotteries")
         widget.set_thumbnail(url=config.PROJECT_THUMBNAIL)
-        for lottery in lotteries_ended:
-            if lottery.has_winners:
-                winners_ids = {_.user_id for _ in lottery.tickets if _.ticket_number in lottery.winning_tickets}
-                winners_mentions = [f"<@!{_}>" for _ in winners_ids]
+        for result in results:
+            if result.winner_ids:
+                winners_mentions = [f"<@!{_}>" for _ in result.winner_ids]
                 winners_mentions_str = ", ".join(winners_mentions)
-                widget.add_field(name=lottery.name, value=f"Winners: {winners_mentions_str}", inline=False)
+                widget.add_field(name=result.lottery.name, value=f"Winners: {winners_mentions_str}", inline=False)
             else:
-                widget.add_field(name=lottery.name, value="Winners: `no winners`", inline=False)
+                widget.add_field(name=result.lottery.name, value="Winners: `no winners`", inline=False)
         await ctx.send(content=ctx.author.mention, embed=widget, delete_after=DELETE_AFTER)
 
-    async def _handle_stopping_sales(self) -> None:
+    @cog_ext.cog_subcommand(
+        base="sweepstake_admin",
+        name="reconcile",
+        guild_ids=config.GUILD_IDS,
+        description="Recompute sold tickets and pools of sweepstakes (admins only)",
+    )
+    async def reconcile(self, ctx: SlashContext):
+        can_control_bot = find(lambda _: _.name in config.ROLES_CAN_CONTROL_BOT, ctx.author.roles)
+        if not can_control_bot:
+            return await ctx.send(
+                f"{ctx.author.mention}, I’m sorry but I can’t do that for you.", delete_after=DELETE_AFTER
+            )
+        fixed_lotteries_count = await reconcile_lottery_counters()
+        lottery_cache.clear()
+        await ctx.send(
+            f"{ctx.author.mention}, success! Counters were fixed for `{fixed_lotteries_count}` sweepstake(s)",
+            delete_after=DELETE_AFTER,
+        )
+
+    async def _handle_stopping_sales(self) -> bool:
         """Handle stopping sales for started lotteries if strike date is close enough"""
         started_lotteries = await Lottery.filter(status=LotteryStatus.STARTED)
         stop_sales_for_lotteries_ids = []
@@ -248,144 +309,218 @@ class LotteryCog(commands.Cog):
         if stop_sales_for_lotteries_ids:
             # bulk change lotteries to LotteryStatus.STOP_SALES
             await Lottery.filter(id__in=stop_sales_for_lotteries_ids).update(status=LotteryStatus.STOP_SALES)
+            lottery_cache.invalidate(*stop_sales_for_lotteries_ids)
+            for lottery_id in stop_sales_for_lotteries_ids:
+                drop_ticket_pool(lottery_id)
             logging.debug(f":::lottery_cron: Stopped selling tickets for: {stop_sales_for_lotteries_ids}")
-        return None
+        return bool(stop_sales_for_lotteries_ids)
+
+    async def _for_each_lottery(self, lotteries: List[Lottery], handler) -> List[bool]:
+        """Run handler for independent lotteries concurrently, failure of one lottery doesn't affect others"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOTTERIES)
+
+        async def handle(lottery: Lottery) -> bool:
+            async with semaphore:
+                try:
+                    return await handler(lottery)
+                except Exception as e:
+                    logging.debug(f":::lottery_cron: {lottery.id}: {e}")
+                    capture_exception(e)
+                    self.failed_lottery_ids.add(lottery.id)
+                    return False
 
-    async def _handle_selecting_winning_tickets(self) -> None:
+        return await asyncio.gather(*[handle(_) for _ in lotteries])
+
+    async def _strike_lottery(self, lottery: Lottery) -> bool:
+        """Select winning tickets for lottery if its strike block has required number of confirmations"""
+        # network calls are made before transaction is opened, this way database connection isn't held idle
+        if not await block_height.is_confirmed(lottery.strike_eth_block):
+            return False
+        # block has been mined, we could select winning ticket numbers
+        block_hash = await get_hash_for_block(lottery.strike_eth_block)
+        async with in_transaction():
+            lottery = await Lottery.filter(id=lottery.id, status=LotteryStatus.STOP_SALES).select_for_update().first()
+            if lottery is None:
+                return False
+            if lottery.is_guaranteed:
+                # tickets are selected by their rank in database, so tickets of lottery aren't loaded into memory
+                lottery.winning_tickets = await select_winning_tickets_for_guaranteed_lottery(lottery, block_hash)
+            else:
+                lottery.winning_tickets = SELECT_WINNING_TICKETS[lottery.vrf_version](
+                    hash=block_hash,
+                    min_number=lottery.ticket_min_number,
+                    max_number=lottery.ticket_max_number,
+                    number_of_winning_tickets=lottery.number_of_winning_tickets,
+                )
+            lottery.status = LotteryStatus.STRIKED
+            await lottery.save(update_fields=["winning_tickets", "status", "modified_at"])
+        logging.debug(f":::lottery_cron: Selected winning tickets for: {lottery.id}")
+        return True
+
+    async def _handle_selecting_winning_tickets(self) -> bool:
         """Handle selecting winning tickets for lottery
 
         Note: we will also ensure that lottery.strike_eth_block has required number of confirmations (aka block depth)
         """
-        stop_sales_lotteries = await Lottery.filter(status=LotteryStatus.STOP_SALES).prefetch_related("tickets")
-        for lottery in stop_sales_lotteries:
-            # check if block was mined with required number of confirmations
-            try:
-                await get_eta_to_block(lottery.strike_eth_block + BLOCK_CONFIRMATIONS)
-                # block hasn't been mined yet
-            except BlockAlreadyMinedException:
-                # block has been mined, we could select winning ticket numbers
-                block_hash = await get_hash_for_block(lottery.strike_eth_block)
-                lottery.winning_tickets = (
-                    select_winning_tickets(
-                        hash=block_hash,
-                        min_number=lottery.ticket_min_number,
-                        max_number=lottery.ticket_max_number,
-                        number_of_winning_tickets=lottery.number_of_winning_tickets,
-                    )
-                    if not lottery.is_guaranteed
-                    else select_winning_tickets_guaranteed(
-                        hash=block_hash,
-                        ticket_numbers=[_.ticket_number for _ in lottery.tickets],
-                        number_of_winning_tickets=lottery.number_of_winning_tickets,
-                    )
-                )
-                lottery.status = LotteryStatus.STRIKED
-                await lottery.save(update_fields=["winning_tickets", "status", "modified_at"])
-                logging.debug(f":::lottery_cron: Selected winning tickets for: {lottery.id}")
-        return None
+        stop_sales_lotteries = await Lottery.filter(status=LotteryStatus.STOP_SALES)
+        return any(await self._for_each_lottery(stop_sales_lotteries, self._strike_lottery))
 
-    async def _handle_payments_to_winners(self) -> bool:
-        """Handle payments for winning tickets
+    async def _pay_winners(self, lottery: Lottery, block_hash: Optional[str]) -> bool:
+        """Pay winning pool to the winners of lottery and end it in a single transaction
 
-        We will check if users have tickets with winning numbers, if they don't lottery points will
-        be added to the total winning pool for the next lottery
+        Returns:
+            False if lottery was already ended
         """
-        striked_lotteries = (
-            await Lottery.filter(status=LotteryStatus.STRIKED)
-            .prefetch_related("tickets")
-            .annotate(total_tickets=Count("tickets"))
-        )
-        notification_channel = self.bot.get_channel(config.LOTTERY_CHANNEL_ID)
-        bulk_save_has_winners = []
-        bulk_save_no_winners = []
-        for lottery in striked_lotteries:
-            # check if lottery has winning tickets
-            winners_ids = set()
-            winning_tickets = []
-            for ticket in lottery.tickets:
-                if ticket.ticket_number in lottery.winning_tickets:
-                    winners_ids.add(ticket.user_id)
-                    winning_tickets.append(ticket)
-                    logging.debug(f":::lottery_cron: Winner for lottery: {lottery.name} is: {ticket.user_id}")
-            # process winners
+        async with in_transaction():
+            lottery = await Lottery.filter(id=lottery.id, status=LotteryStatus.STRIKED).select_for_update().first()
+            if lottery is None:
+                return False
+            winning_tickets = (await get_winning_tickets([lottery]))[lottery.id]
+            winners_ids = {_.user_id for _ in winning_tickets}
+            logging.debug(f":::lottery_cron: Winners for lottery: {lottery.name} are: {winners_ids}")
+            result = LotteryResult(
+                lottery_id=lottery.id,
+                winning_tickets=lottery.winning_tickets,
+                winner_ids=sorted(winners_ids),
+                pool_paid=0,
+                block_hash=block_hash,
+            )
             if winning_tickets:
-                bulk_save_has_winners.append(lottery.id)
-                # get winning pool for the current lottery
-                lottery_pool = lottery.total_tickets * lottery.ticket_price
-                # get old winning pool
+                # winners get lottery pool and old winning pool from past lotteries without winners
                 old_winning_pool = await get_old_winning_pool()
-                total_winning_pool = old_winning_pool + lottery_pool
+                total_winning_pool = lottery.pool_total + old_winning_pool
                 winning_ticket_share = total_winning_pool / len(winning_tickets)
-                # share winning pool between winners
+                # share winning pool between winners, payouts are applied with single query
+                payouts = defaultdict(int)
                 for w_ticket in winning_tickets:
-                    await User.filter(id__in=[w_ticket.user_id]).update(
-                        balance=F("balance") + int(winning_ticket_share)
-                    )
+                    payouts[w_ticket.user_id] += int(winning_ticket_share)
+                await credit_balances(payouts)
+                result.winning_ticket_share = int(winning_ticket_share)
+                result.pool_paid = int(winning_ticket_share) * len(winning_tickets)
                 # remove old winning pool (because it was paid to the winners)
                 if old_winning_pool:
                     await Lottery.filter(Q(status=LotteryStatus.ENDED) & Q(has_winners=False)).update(has_winners=True)
-                winners_mentions = [f"<@!{_}>" for _ in winners_ids]
-                winners_mentions_str = ", ".join(winners_mentions)
-            else:
-                bulk_save_no_winners.append(lottery.id)
-            widget = Embed(
-                description=f"`{lottery.name}` striked",
-                color=GOLD,
-                title=lottery.name,
-            )
-            widget.set_thumbnail(url=config.PROJECT_THUMBNAIL)
+                lottery.has_winners = True
+            lottery.status = LotteryStatus.ENDED
+            await lottery.save(update_fields=["status", "has_winners", "modified_at"])
+            await result.save()
+            # announcement is written to outbox in the same transaction and delivered by notifications dispatcher
+            await self._announce_results(lottery, winners_ids)
+        return True
+
+    async def _announce_results(self, lottery: Lottery, winners_ids: Set[int]) -> None:
+        """Add results announcement to notifications outbox (runs inside current transaction)"""
+        widget = Embed(
+            description=f"`{lottery.name}` striked",
+            color=GOLD,
+            title=lottery.name,
+        )
+        widget.set_thumbnail(url=config.PROJECT_THUMBNAIL)
+        widget.add_field(
+            name="Winning tickets:",
+            value=f"`{', '.join(map(str, lottery.winning_tickets))}`" if lottery.winning_tickets else "`-`",
+            inline=False,
+        )
+        if winners_ids:
+            winners_mentions = [f"<@!{_}>" for _ in winners_ids]
+            winners_mentions_str = ", ".join(winners_mentions)
+            widget.add_field(name=":trophy::trophy:Winners:trophy::trophy:", value=winners_mentions_str, inline=False)
+            await enqueue_notification(config.LOTTERY_CHANNEL_ID, content=winners_mentions_str, embed=widget)
+        else:
             widget.add_field(
-                name="Winning tickets:",
-                value=f"`{', '.join(map(str, lottery.winning_tickets))}`" if lottery.winning_tickets else "`-`",
+                name="Winners:",
+                value="Nobody won the sweepstake, winning pool will be added to the next sweepstake",
                 inline=False,
             )
-            if winners_ids:
-                widget.add_field(
-                    name=":trophy::trophy:Winners:trophy::trophy:", value=winners_mentions_str, inline=False
-                )
-                # send notification to the channel
-                await notification_channel.send(content=winners_mentions_str, embed=widget)
-            else:
-                widget.add_field(
-                    name="Winners:",
-                    value="Nobody won the sweepstake, winning pool will be added to the next sweepstake",
-                    inline=False,
-                )
-                # send notification to the channel
-                await notification_channel.send(embed=widget)
-        # bulk change lotteries to LotteryStatus.ENDED
-        should_reload_options = False
-        if bulk_save_has_winners:
-            await Lottery.filter(id__in=bulk_save_has_winners).update(status=LotteryStatus.ENDED, has_winners=True)
-            should_reload_options = True
-        if bulk_save_no_winners:
-            await Lottery.filter(id__in=bulk_save_no_winners).update(status=LotteryStatus.ENDED)
-            should_reload_options = True
-        return should_reload_options
+            await enqueue_notification(config.LOTTERY_CHANNEL_ID, embed=widget)
 
-    @tasks.loop(seconds=config.CHECK_LOTTERY_STATUS_SECONDS)
-    async def lottery_status_cron_job(self):
-        with Hub(Hub.current):
-            # ensure that only one instance of job is running, other instances will be discarded
-            if not self.lock.locked():
-                await self.lock.acquire()
+    async def _handle_payments_to_winners(self) -> bool:
+        """Handle payments for winning tickets
+
+        We will check if users have tickets with winning numbers, if they don't lottery points will
+        be added to the total winning pool for the next lottery
+
+        Note: lotteries are ended one by one (each in its own transaction) because the first lottery with winners
+        takes old winning pool, so they can't be processed concurrently
+        """
+        striked_lotteries = await Lottery.filter(status=LotteryStatus.STRIKED).order_by("created_at")
+        if not striked_lotteries:
+            return False
+        block_hashes = dict(
+            await BlockHash.filter(block_number__in=[_.strike_eth_block for _ in striked_lotteries]).values_list(
+                "block_number", "hash"
+            )
+        )
+        has_ended = False
+        for lottery in striked_lotteries:
+            try:
+                if await self._pay_winners(lottery, block_hashes.get(lottery.strike_eth_block)):
+                    has_ended = True
+            except Exception as e:
+                logging.debug(f":::lottery_cron: {lottery.id}: {e}")
+                capture_exception(e)
+                self.failed_lottery_ids.add(lottery.id)
+        if has_ended:
+            wake_dispatcher()
+        return has_ended
+
+    async def _schedule_lotteries(self, retry_after: float) -> None:
+        """Arm scheduler with deadlines of all lotteries which are not ended yet"""
+        lotteries = await Lottery.filter(
+            status__in=[LotteryStatus.STARTED, LotteryStatus.STOP_SALES, LotteryStatus.STRIKED]
+        )
+        # clear only after query succeeded, otherwise deadlines which weren't due yet would be lost
+        self.scheduler.clear()
+        retry_at = timezone.now() + timedelta(seconds=retry_after)
+        for lottery in lotteries:
+            deadline = get_lottery_deadline(lottery, retry_after=retry_after)
+            if lottery.id in self.failed_lottery_ids:
+                # back off failed lotteries, otherwise struck lottery which can't be paid would cause busy loop
+                deadline = max(deadline, retry_at)
+            self.scheduler.schedule(lottery.id, deadline)
+        logging.debug(f":::lottery_cron: Scheduled {len(self.scheduler)} lotteries")
+
+    async def _handle_lottery_statuses(self) -> None:
+        self.failed_lottery_ids.clear()
+        # every lottery transition runs in its own short transaction
+        has_stopped_sales = await self._handle_stopping_sales()
+        has_striked = await self._handle_selecting_winning_tickets()
+        has_ended = await self._handle_payments_to_winners()
+        if has_stopped_sales or has_striked or has_ended:
+            # statuses were changed via bulk updates, so we drop all cached lotteries
+            lottery_cache.clear()
+        if has_stopped_sales or has_ended:
+            await lottery_names.load()
+        logging.debug(f":::lottery_cron: Lottery cache stats: {lottery_cache.stats()}")
+
+    async def lottery_status_job(self):
+        """Sleep until the earliest lottery deadline, then handle lottery statuses and re-arm scheduler"""
+        await self.bot.wait_until_ready()
+        # deadline is re-checked after this interval if lottery is late (or if handling of statuses failed)
+        retry_after = config.CHECK_LOTTERY_STATUS_SECONDS
+        while True:
+            with Hub(Hub.current):
                 try:
-                    should_reload_options = False
-                    async with in_transaction():
-                        await self._handle_stopping_sales()
-                        await self._handle_selecting_winning_tickets()
-                        should_reload_options = await self._handle_payments_to_winners()
-                    if should_reload_options:
-                        await reload_options_hack(self.bot)
+                    await self._schedule_lotteries(retry_after=0)
+                    break
                 except Exception as e:
                     logging.debug(f":::lottery_cron: {e}")
                     capture_exception(e)
-                finally:
-                    self.lock.release()
-
-    @lottery_status_cron_job.before_loop
-    async def before_check_lottery_status(self):
-        await self.bot.wait_until_ready()
+            await asyncio.sleep(retry_after)
+        while True:
+            lottery_ids = await self.scheduler.wait()
+            with Hub(Hub.current):
+                logging.debug(f":::lottery_cron: Deadlines passed for: {lottery_ids}")
+                try:
+                    await self._handle_lottery_statuses()
+                    await self._schedule_lotteries(retry_after=retry_after)
+                except Exception as e:
+                    logging.debug(f":::lottery_cron: {e}")
+                    capture_exception(e)
+                    # retry due lotteries later, this way failing lottery doesn't cause busy loop
+                    # (deadlines of other lotteries are kept in scheduler)
+                    for lottery_id in lottery_ids:
+                        self.scheduler.schedule(lottery_id, timezone.now() + timedelta(seconds=retry_after))
 
 
 def setup(bot):
@@ -0,0 +1,87 @@
+import logging
+import asyncio
+from datetime import timedelta
+
+from discord import Embed, HTTPException
+from discord.ext import commands
+from tortoise import timezone
+from tortoise.query_utils import Q
+from sentry_sdk import capture_exception, Hub
+
+import config
+from app.models import Notification
+from app.outbox import wait_for_notifications
+from app.exceptions import ChannelNotAvailableException
+from app.constants import NOTIFICATIONS_BATCH_SIZE, NOTIFICATION_MAX_ATTEMPTS
+
+
+class NotificationsCog(commands.Cog):
+    """Deliver messages from notifications outbox to Discord channels"""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.dispatcher_task = bot.loop.create_task(self.dispatcher_job())
+
+    def cog_unload(self):
+        self.dispatcher_task.cancel()
+
+    async def _deliver(self, notification: Notification) -> None:
+        channel = self.bot.get_channel(notification.channel_id)
+        if channel is None:
+            raise ChannelNotAvailableException(f"Channel {notification.channel_id} isn't available")
+        embed = Embed.from_dict(notification.embed) if notification.embed else None
+        await channel.send(content=notification.content, embed=embed)
+
+    async def _dispatch_batch(self) -> bool:
+        """Deliver batch of pending notifications
+
+        Returns:
+            True if batch was full (there could be more pending notifications)
+        """
+        now = timezone.now()
+        notifications = (
+            await Notification.filter(
+                Q(sent_at=None)
+                & Q(attempts__lt=NOTIFICATION_MAX_ATTEMPTS)
+                & (Q(next_attempt_at=None) | Q(next_attempt_at__lte=now))
+            )
+            .order_by("created_at")
+            .limit(NOTIFICATIONS_BATCH_SIZE)
+        )
+        for notification in notifications:
+            try:
+                # messages are sent one by one, discord.py waits for rate limits (429) of the channel route
+                await self._deliver(notification)
+            except (HTTPException, ChannelNotAvailableException) as e:
+                # retry with exponential backoff
+                notification.attempts += 1
+                notification.next_attempt_at = timezone.now() + timedelta(seconds=2 ** notification.attempts)
+                await notification.save(update_fields=["attempts", "next_attempt_at"])
+                logging.debug(f":::notifications: Failed to deliver {notification}: {e}")
+                if notification.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+                    capture_exception(e)
+                continue
+            notification.sent_at = timezone.now()
+            await notification.save(update_fields=["sent_at"])
+        return len(notifications) == NOTIFICATIONS_BATCH_SIZE
+
+    async def dispatcher_job(self):
+        await self.bot.wait_until_ready()
+        while True:
+            has_more = False
+            with Hub(Hub.current):
+                try:
+                    has_more = await self._dispatch_batch()
+                except Exception as e:
+                    logging.debug(f":::notifications: {e}")
+                    capture_exception(e)
+            if not has_more:
+                # failed notifications are retried after this interval at the latest
+                await wait_for_notifications(timeout=config.CHECK_LOTTERY_STATUS_SECONDS)
+            else:
+                # let other tasks run between batches
+                await asyncio.sleep(0)
+
+
+def setup(bot):
+    bot.add_cog(NotificationsCog(bot))
@@ -1,37 +1,111 @@
 import asyncio
-from random import SystemRandom
+from typing import List, Optional
 
 from discord import Embed
 from discord.utils import find
 from discord.ext import commands
 from tortoise.query_utils import Q
 from tortoise.transactions import in_transaction
-from discord_slash import SlashContext
+from discord_slash import cog_ext, SlashContext
+from discord_slash.utils.manage_commands import create_option
+from discord_slash.model import SlashCommandOptionType
 
-from config import ROLES_CAN_CONTROL_BOT, POINTS_EMOJI, PROJECT_THUMBNAIL
+from config import GUILD_IDS, ROLES_CAN_CONTROL_BOT, POINTS_EMOJI, PROJECT_THUMBNAIL
 from app.models import Lottery, Ticket, User
-from app.utils import (
-    ensure_registered,
-    pp_points,
-    register_buy_ticket_command,
-    register_buy_whitelisted_command,
-    register_my_tickets_command,
-)
-from app.constants import LotteryStatus, GREEN, DELETE_AFTER
-
-
-cryptogen = SystemRandom()
+from app.allocator import create_tickets, get_ticket_pool, drop_ticket_pool
+from app.cache import lottery_cache
+from app.names import lottery_names
+from app.utils import ensure_registered, ensure_registered_bulk, pp_points, resolve_lottery_name
+from app.constants import LotteryStatus, GREEN, DELETE_AFTER, MAX_TICKETS_PER_PURCHASE
+from app.exceptions import NoTicketsLeftException
 
 
 class TicketCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.bot.loop.create_task(register_buy_ticket_command(self.bot, self.buy_ticket))
-        self.bot.loop.create_task(register_my_tickets_command(self.bot, self.my_tickets))
-        self.bot.loop.create_task(register_buy_whitelisted_command(self.bot, self.buy_whitelisted))
+        self.bot.loop.create_task(self.load_ticket_pools())
+
+    async def load_ticket_pools(self):
+        """Build pools of free ticket numbers for lotteries which are selling tickets"""
+        for lottery in await Lottery.filter(status=LotteryStatus.STARTED):
+            await get_ticket_pool(lottery)
+
+    async def _ensure_sales_allowed(self, ctx: SlashContext, lottery: Lottery) -> bool:
+        """Send error message and return False if tickets can't be bought for lottery"""
+        if lottery.status == LotteryStatus.STOP_SALES:
+            await ctx.send(
+                f"{ctx.author.mention}, tickets can't be bought for `{lottery.name}` because there are no tickets left or it's close to strike date",  # noqa: E501
+                delete_after=DELETE_AFTER,
+            )
+        elif lottery.status == LotteryStatus.STRIKED:
+            await ctx.send(
+                f"{ctx.author.mention}, tickets can't be bought for `{lottery.name}` because winning tickets were already selected",  # noqa: E501
+                delete_after=DELETE_AFTER,
+            )
+        elif lottery.status == LotteryStatus.ENDED:
+            await ctx.send(
+                f"{ctx.author.mention}, tickets can't be bought for `{lottery.name}` because it has ended",
+                delete_after=DELETE_AFTER,
+            )
+        return lottery.status == LotteryStatus.STARTED
+
+    async def _send_not_enough_points(self, ctx: SlashContext, user: User, lottery: Lottery, quantity: int):
+        total_price = lottery.ticket_price * quantity
+        total_price_str = f" (`{int(total_price)}`{POINTS_EMOJI} for {quantity})" if quantity > 1 else ""
+        await ctx.send(
+            f"{ctx.author.mention}, not enough points, you only have `{pp_points(user.balance)}`{POINTS_EMOJI} in your sweepstake wallet and ticket price is `{int(lottery.ticket_price)}`{POINTS_EMOJI}{total_price_str}. To add points to your sweepstake wallet, `!send @{ctx.bot.user.display_name}#{ctx.bot.user.discriminator} [number of points]`",  # noqa: E501
+            delete_after=DELETE_AFTER,
+        )
+
+    async def _wait_for_mentions(self, ctx: SlashContext, prompt: str) -> Optional[List[int]]:
+        """Ask user to mention users in the next message
+
+        Note: it shouldn't be called inside transaction, user could answer in up to 5 minutes
+
+        Returns:
+            ids of mentioned users or None if user didn't answer in time
+        """
+        await ctx.send(prompt, delete_after=DELETE_AFTER)
+        try:
+            message = await self.bot.wait_for(
+                "message",
+                check=lambda m: m.guild is not None and m.author == ctx.author,
+                timeout=300,
+            )
+        except asyncio.TimeoutError:
+            return None
+        return message.raw_mentions
+
+    async def _stop_sales(self, lottery: Lottery) -> None:
+        """Stop ticket sales for lottery because all tickets were sold
+
+        Note: lottery should be invalidated in cache after transaction is committed
+        """
+        # conditional update, this way status which was changed concurrently (e.g. by lottery cron) isn't overwritten
+        await Lottery.filter(id=lottery.id, status=LotteryStatus.STARTED).update(status=LotteryStatus.STOP_SALES)
+        lottery.status = LotteryStatus.STOP_SALES
+        drop_ticket_pool(lottery.id)
+        lottery_names.add(lottery.name, LotteryStatus.STOP_SALES)
 
+    @cog_ext.cog_subcommand(
+        base="sweepstake_admin",
+        name="buy_whitelisted",
+        guild_ids=GUILD_IDS,
+        description="Batch Buy Whitelisted tickets (admins only)",
+        options=[
+            create_option(
+                name="name",
+                description="Sweepstake name (or its beginning)",
+                option_type=SlashCommandOptionType.STRING,
+                required=True,
+            ),
+        ],
+    )
     async def buy_whitelisted(self, ctx: SlashContext, name: str):
         # batch ticket buying logic (admin only)
+        name = await resolve_lottery_name(ctx, name, only_started=True)
+        if not name:
+            return
         await ensure_registered(ctx.author.id)
         can_control_bot = find(lambda _: _.name in ROLES_CAN_CONTROL_BOT, ctx.author.roles)
         # validate that user can control bot
@@ -41,7 +115,7 @@ class TicketCog(commands.Cog):
                 delete_after=DELETE_AFTER,
             )
         # validate that lottery exists
-        lottery = await Lottery.get_or_none(name=name)
+        lottery = await lottery_cache.get_by_name(name)
         if not lottery:
             return await ctx.send(
                 f"{ctx.author.mention}, error, sweepstake `{name}` doesn't exist",
@@ -54,205 +128,221 @@ class TicketCog(commands.Cog):
                 delete_after=DELETE_AFTER,
             )
         # validate that we allow selling tickets
-        if lottery.status == LotteryStatus.STOP_SALES:
+        if not await self._ensure_sales_allowed(ctx, lottery):
+            return
+        # collect mentions before transaction is opened, this way database connection isn't held while we wait
+        owner_ids = await self._wait_for_mentions(
+            ctx,
+            f"Hello, {ctx.author.mention}, this sweepstake is of whitelisted type, please mention user(s) in the next message for whom you want to buy ticket(s)",  # noqa: E501
+        )
+        if owner_ids is None:
+            return
+        if len(owner_ids) < 1:
             return await ctx.send(
-                f"{ctx.author.mention}, tickets can't be bought for `{name}` because there are no tickets left or it's close to strike date",  # noqa: E501
+                f"{ctx.author.mention}, you need to mention at least one person",
                 delete_after=DELETE_AFTER,
-            )
-        elif lottery.status == LotteryStatus.STRIKED:
+            )  # noqa: E501
+        # remove duplicates from list
+        owner_ids = list(set(owner_ids))
+        # ensure that all owners are registered
+        await ensure_registered_bulk(owner_ids)
+        try:
+            async with in_transaction() as connection:
+                # lottery could be changed while we were waiting for mentions, so validate it once again
+                lottery = await Lottery.get(id=lottery.id)
+                if not await self._ensure_sales_allowed(ctx, lottery):
+                    return
+                # bulk create tickets, ensure that there is enough free to use tickets
+                pool = await get_ticket_pool(lottery)
+                tickets_left = len(pool)
+                tickets_raw = await create_tickets(connection, lottery, owner_ids)
+                if not len(pool):
+                    await self._stop_sales(lottery)
+        except NoTicketsLeftException:
+            # transaction was rolled back, numbers taken from the pool were released by create_tickets
             return await ctx.send(
-                f"{ctx.author.mention}, tickets can't be bought for `{name}` because winning tickets were already selected",  # noqa: E501
+                f"{ctx.author.mention}, there is not enough tickets left (tickets left: {tickets_left})",
                 delete_after=DELETE_AFTER,
+            )  # noqa: E501
+        except Exception:
+            # numbers taken from the pool could belong to rolled back tickets, so pool will be rebuilt from database
+            drop_ticket_pool(lottery.id)
+            raise
+        # invalidate after commit, otherwise concurrent command could cache lottery with outdated counters
+        lottery_cache.invalidate(lottery.id)
+        # avoid hitting discord max length limit
+        # split success messages into 20 tickets each
+        for i in range(0, len(tickets_raw), 20):
+            tickets_chunk = tickets_raw[i : i + 20]
+            string_message = ""
+            for ticket in tickets_chunk:
+                string_message += f" <@!{ticket.user_id}>(`{ticket.ticket_number}` :tickets:),"
+            string_message = string_message[:-1]
+            await ctx.send(
+                f"Congratulations {ctx.author.mention}, you just purchased tickets for `{lottery.name}` for:{string_message}"  # noqa: E501
             )
-        elif lottery.status == LotteryStatus.ENDED:
+            await asyncio.sleep(0.5)
+
+    @cog_ext.cog_subcommand(
+        base="sweepstake",
+        name="buy",
+        guild_ids=GUILD_IDS,
+        description="Buy ticket",
+        options=[
+            create_option(
+                name="name",
+                description="Sweepstake name (or its beginning)",
+                option_type=SlashCommandOptionType.STRING,
+                required=True,
+            ),
+            create_option(
+                name="quantity",
+                description=f"Number of tickets (default 1, max {MAX_TICKETS_PER_PURCHASE})",
+                option_type=SlashCommandOptionType.INTEGER,
+                required=False,
+            ),
+        ],
+    )
+    async def buy_ticket(self, ctx: SlashContext, name: str, quantity: int = 1):
+        # ticket buying logic
+        if not 1 <= quantity <= MAX_TICKETS_PER_PURCHASE:
             return await ctx.send(
-                f"{ctx.author.mention}, tickets can't be bought for `{name}` because it has ended",
+                f"{ctx.author.mention}, error, `quantity` should be between 1 and {MAX_TICKETS_PER_PURCHASE}",
                 delete_after=DELETE_AFTER,
             )
-        async with in_transaction():
-            try:
-                await ctx.send(
-                    f"Hello, {ctx.author.mention}, this sweepstake is of whitelisted type, please mention user(s) in the next message for whom you want to buy ticket(s)",  # noqa: E501
-                    delete_after=DELETE_AFTER,
-                )
-                message = await self.bot.wait_for(
-                    "message",
-                    check=lambda m: m.guild is not None and m.author == ctx.author,
-                    timeout=300,
-                )
-                if len(message.raw_mentions) < 1:
-                    return await ctx.send(
-                        f"{ctx.author.mention}, you need to mention at least one person",
-                        delete_after=DELETE_AFTER,
-                    )  # noqa: E501
-                owner_ids = message.raw_mentions
-                # remove duplicates from list
-                owner_ids = list(set(owner_ids))
-                # ensure that all owners are registered
-                for owner_id in owner_ids:
-                    await ensure_registered(owner_id)
-                # retrieve owners from db
-                owners = await User.filter(id__in=owner_ids)
-                # get existing ticket numbers from database to avoid collisions
-                ticket_numbers = await Ticket.filter(lottery=lottery).values_list(
-                    "ticket_number", flat=True
-                )
-                # ensure that there is enough available tickets left
-                # make range to behave as inclusive range, this way ticket with max_number could be won
-                all_possible_tickets = lottery.ticket_max_number + 1 - lottery.ticket_min_number
-                already_existing_tickets = len(ticket_numbers)
-                tickets_left = all_possible_tickets - already_existing_tickets
-                need_to_create_tickets = len(owner_ids)
-                # ensure that there is enough free to use tickets
-                if tickets_left < need_to_create_tickets:
-                    return await ctx.send(
-                        f"{ctx.author.mention}, there is not enough tickets left (tickets left: {tickets_left})",
-                        delete_after=DELETE_AFTER,
-                    )  # noqa: E501
-                # find out ticket numbers which are free to use
-                free_ticket_numbers_set = set(
-                    range(lottery.ticket_min_number, lottery.ticket_max_number + 1)
-                ) - set(ticket_numbers)
-                free_ticket_numbers = list(free_ticket_numbers_set)
-                # shuffle free to use ticket numbers
-                cryptogen.shuffle(free_ticket_numbers)
-                # bulk create tickets
-                tickets_raw = [
-                    Ticket(
-                        user=owner,
-                        lottery=lottery,
-                        ticket_number=free_ticket_numbers[i],
-                    )
-                    for i, owner in enumerate(owners)
-                ]
-                await Ticket.bulk_create(tickets_raw)
-                if tickets_left == need_to_create_tickets:
-                    lottery.status = LotteryStatus.STOP_SALES
-                    await lottery.save(update_fields=["status", "modified_at"])
-                # avoid hitting discord max length limit
-                # split success messages into 20 tickets each
-                for i in range(0, len(tickets_raw), 20):
-                    tickets_chunk = tickets_raw[i : i + 20]
-                    string_message = ""
-                    for ticket in tickets_chunk:
-                        string_message += (
-                            f" <@!{ticket.user.id}>(`{ticket.ticket_number}` :tickets:),"
-                        )
-                    string_message = string_message[:-1]
-                    await ctx.send(
-                        f"Congratulations {ctx.author.mention}, you just purchased tickets for `{lottery.name}` for:{string_message}"  # noqa: E501
-                    )
-                    await asyncio.sleep(0.5)
-            except asyncio.TimeoutError:
-                return
-
-    async def buy_ticket(self, ctx: SlashContext, name: str):
-        # ticket buying logic
+        name = await resolve_lottery_name(ctx, name, only_started=True)
+        if not name:
+            return
         await ensure_registered(ctx.author.id)
         can_control_bot = find(lambda _: _.name in ROLES_CAN_CONTROL_BOT, ctx.author.roles)
-        async with in_transaction():  # prevent race conditions via select_for_update + in_transaction
-            # select user 2nd time to lock it's row
-            user = await User.filter(id=ctx.author.id).select_for_update().get(id=ctx.author.id)
-            # validate that lottery exists
-            lottery = await Lottery.get_or_none(name=name)
-            if not lottery:
-                return await ctx.send(
-                    f"{ctx.author.mention}, error, sweepstake `{name}` doesn't exist",
-                    delete_after=DELETE_AFTER,
-                )
-            # validate that we allow selling tickets
-            if lottery.status == LotteryStatus.STOP_SALES:
-                return await ctx.send(
-                    f"{ctx.author.mention}, tickets can't be bought for `{name}` because there are no tickets left or it's close to strike date",  # noqa: E501
-                    delete_after=DELETE_AFTER,
-                )
-            elif lottery.status == LotteryStatus.STRIKED:
+        # validate that lottery exists
+        lottery = await lottery_cache.get_by_name(name)
+        if not lottery:
+            return await ctx.send(
+                f"{ctx.author.mention}, error, sweepstake `{name}` doesn't exist",
+                delete_after=DELETE_AFTER,
+            )
+        # validate that we allow selling tickets
+        if not await self._ensure_sales_allowed(ctx, lottery):
+            return
+        # validate that lottery is of whitelisted type and user can control bot
+        if lottery.is_whitelisted and not can_control_bot:
+            return await ctx.send(
+                f"{ctx.author.mention}, tickets can't be bought for `{name}` because it is of `whitelisted` type",
+                delete_after=DELETE_AFTER,
+            )
+        # handle whitelisted lotteries, mentioned user is collected before transaction is opened
+        # this way user row isn't locked while we wait for the message
+        is_whitelisted_ticket = lottery.is_whitelisted and can_control_bot
+        if is_whitelisted_ticket:
+            # don't ask for mention if user can't afford tickets anyway (balance is validated again below)
+            user = await User.get(id=ctx.author.id)
+            if user.balance < lottery.ticket_price * quantity:
+                return await self._send_not_enough_points(ctx, user, lottery, quantity)
+            owner_ids = await self._wait_for_mentions(
+                ctx,
+                f"Hello, {ctx.author.mention}, this sweepstake is of whitelisted type, please mention user for whom you want to buy a ticket",  # noqa: E501
+            )
+            if owner_ids is None:
+                return
+            if len(owner_ids) != 1:
                 return await ctx.send(
-                    f"{ctx.author.mention}, tickets can't be bought for `{name}` because winning tickets were already selected",  # noqa: E501
+                    f"{ctx.author.mention}, you need to mention only one person",
                     delete_after=DELETE_AFTER,
-                )
-            elif lottery.status == LotteryStatus.ENDED:
+                )  # noqa: E501
+            owner_id = owner_ids[0]
+            await ensure_registered(owner_id)
+        else:
+            owner_id = ctx.author.id
+        try:
+            async with in_transaction() as connection:  # prevent race conditions via select_for_update + in_transaction
+                # select user 2nd time to lock it's row
+                user = await User.filter(id=ctx.author.id).select_for_update().get(id=ctx.author.id)
+                # cached lottery could be outdated (or changed while we were waiting for mention), so validate it again
+                lottery = await Lottery.get(id=lottery.id)
+                if not await self._ensure_sales_allowed(ctx, lottery):
+                    return
+                # validate user balance
+                total_price = lottery.ticket_price * quantity
+                if user.balance < total_price:
+                    return await self._send_not_enough_points(ctx, user, lottery, quantity)
+                # create tickets with random numbers which aren't used yet (all tickets are inserted at once)
+                pool = await get_ticket_pool(lottery)
+                tickets_left = len(pool)
+                tickets = await create_tickets(connection, lottery, [owner_id] * quantity)
+                # debit balance once for all tickets
+                user.balance = user.balance - total_price
+                await user.save(update_fields=["balance", "modified_at"])
+        except NoTicketsLeftException:
+            # transaction was rolled back, numbers taken from the pool were released by create_tickets
+            if quantity > 1 and tickets_left:
                 return await ctx.send(
-                    f"{ctx.author.mention}, tickets can't be bought for `{name}` because it has ended",
+                    f"{ctx.author.mention}, there is not enough tickets left (tickets left: {tickets_left})",
                     delete_after=DELETE_AFTER,
                 )
-            # validate that lottery is of whitelisted type and user can control bot
-            if lottery.is_whitelisted and not can_control_bot:
-                return await ctx.send(
-                    f"{ctx.author.mention}, tickets can't be bought for `{name}` because it is of `whitelisted` type",
-                    delete_after=DELETE_AFTER,
+            # it means that all tickets were sold, stop ticket sales for lottery
+            async with in_transaction():
+                await self._stop_sales(lottery)
+            lottery_cache.invalidate(lottery.id)
+            return await ctx.send(
+                f"{ctx.author.mention}, ouch, the last ticket was sold a moment ago",
+                delete_after=DELETE_AFTER,
+            )
+        except Exception:
+            # numbers taken from the pool could belong to rolled back tickets, so pool will be rebuilt from database
+            drop_ticket_pool(lottery.id)
+            raise
+        # invalidate after commit, otherwise concurrent command could cache lottery with outdated counters
+        lottery_cache.invalidate(lottery.id)
+        if quantity == 1:
+            (ticket,) = tickets
+            if is_whitelisted_ticket:
+                await ctx.send(
+                    f":tickets: Congratulations <@!{owner_id}>, you just had {lottery.name} purchased for you by {ctx.author.mention}.  Your ticket number is: {ticket.ticket_number}:tickets:"  # noqa: E501
                 )
-            # validate user balance
-            if user.balance < lottery.ticket_price:
-                return await ctx.send(
-                    f"{ctx.author.mention}, not enough points, you only have `{pp_points(user.balance)}`{POINTS_EMOJI} in your sweepstake wallet and ticket price is `{int(lottery.ticket_price)}`{POINTS_EMOJI}. To add points to your sweepstake wallet, `!send @{ctx.bot.user.display_name}#{ctx.bot.user.discriminator} [number of points]`",  # noqa: E501
-                    delete_after=DELETE_AFTER,
+            else:
+                await ctx.send(
+                    f"{ctx.author.mention}, you bought {lottery.name} ticket with number: `{ticket.ticket_number}`, your balance is: `{pp_points(user.balance)}`{POINTS_EMOJI}"  # noqa: E501
                 )
-            # handle whitelisted lotteries
-            is_whitelisted_ticket = lottery.is_whitelisted and can_control_bot
+            return
+        # avoid hitting discord max length limit
+        # split success messages into 20 tickets each
+        for i in range(0, len(tickets), 20):
+            tickets_chunk = tickets[i : i + 20]
+            string_message = ", ".join([f"`{_.ticket_number}`" for _ in tickets_chunk])
             if is_whitelisted_ticket:
-                try:
-                    await ctx.send(
-                        f"Hello, {ctx.author.mention}, this sweepstake is of whitelisted type, please mention user for whom you want to buy a ticket",  # noqa: E501
-                        delete_after=DELETE_AFTER,
-                    )
-                    message = await self.bot.wait_for(
-                        "message",
-                        check=lambda m: m.guild is not None and m.author == ctx.author,
-                        timeout=300,
-                    )
-                    if len(message.raw_mentions) != 1:
-                        return await ctx.send(
-                            f"{ctx.author.mention}, you need to mention only one person",
-                            delete_after=DELETE_AFTER,
-                        )  # noqa: E501
-                    owner_id = message.raw_mentions[0]
-                    await ensure_registered(owner_id)
-                    owner = await User.get(id=owner_id)
-                except asyncio.TimeoutError:
-                    return
-            else:
-                owner = user
-            # to generate random ticket number that doesn't have collisions we will need to grab all ticket numbers
-            # from database and then check in python which numbers are available
-            ticket_numbers = await Ticket.filter(lottery=lottery).values_list(
-                "ticket_number", flat=True
-            )
-            # create ticket for user
-            try:
-                ticket = await Ticket.create(
-                    user=owner,
-                    lottery=lottery,
-                    ticket_number=cryptogen.choice(
-                        [
-                            _
-                            # make range to behave as inclusive range, this way ticket with max_number could be won
-                            for _ in range(lottery.ticket_min_number, lottery.ticket_max_number + 1)
-                            if _ not in ticket_numbers
-                        ]
-                    ),
+                await ctx.send(
+                    f":tickets: Congratulations <@!{owner_id}>, you just had {lottery.name} tickets purchased for you by {ctx.author.mention}. Your ticket numbers are: {string_message}:tickets:"  # noqa: E501
                 )
-                user.balance = user.balance - lottery.ticket_price
-                await user.save(update_fields=["balance", "modified_at"])
-                if is_whitelisted_ticket:
-                    await ctx.send(
-                        f":tickets: Congratulations <@!{owner.id}>, you just had {lottery.name} purchased for you by {ctx.author.mention}.  Your ticket number is: {ticket.ticket_number}:tickets:"  # noqa: E501
-                    )
-                else:
-                    await ctx.send(
-                        f"{ctx.author.mention}, you bought {lottery.name} ticket with number: `{ticket.ticket_number}`, your balance is: `{pp_points(user.balance)}`{POINTS_EMOJI}"  # noqa: E501
-                    )
-            except IndexError:
-                # it means that all tickets were sold, stop ticket sales for lottery
-                lottery.status = LotteryStatus.STOP_SALES
-                await lottery.save(update_fields=["status", "modified_at"])
+            else:
                 await ctx.send(
-                    f"{ctx.author.mention}, ouch, the last ticket was sold a moment ago",
-                    delete_after=DELETE_AFTER,
+                    f"{ctx.author.mention}, you bought {lottery.name} tickets with numbers: {string_message}"
                 )
+            await asyncio.sleep(0.5)
+        if not is_whitelisted_ticket:
+            await ctx.send(
+                f"{ctx.author.mention}, you bought {quantity} tickets, your balance is: `{pp_points(user.balance)}`{POINTS_EMOJI}"  # noqa: E501
+            )
 
+    @cog_ext.cog_subcommand(
+        base="sweepstake",
+        name="tickets",
+        guild_ids=GUILD_IDS,
+        description="My tickets",
+        options=[
+            create_option(
+                name="name",
+                description="Sweepstake name (or its beginning)",
+                option_type=SlashCommandOptionType.STRING,
+                required=True,
+            ),
+        ],
+    )
     async def my_tickets(self, ctx: SlashContext, name: str):
-        lottery = await Lottery.get_or_none(name=name)
+        name = await resolve_lottery_name(ctx, name)
+        if not name:
+            return
+        lottery = await lottery_cache.get_by_name(name)
         if not lottery:
             return await ctx.send(
                 f"{ctx.author.mention}, error, sweepstake `{name}` doesn't exist",
@@ -61,7 +61,8 @@ class WalletCog(commands.Cog):
         description="View my sweepstake wallet",
     )
     async def my_wallet(self, ctx: SlashContext):
-        user = await ensure_registered(ctx.author.id)
+        await ensure_registered(ctx.author.id)
+        user = await User.get(id=ctx.author.id)
         await ctx.send(
             f"{ctx.author.mention}, your balance is: {pp_points(user.balance)}{config.POINTS_EMOJI}",
             delete_after=DELETE_AFTER,
@@ -0,0 +1,81 @@
+import time
+import logging
+import functools
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from discord_slash import SlashCommand, SlashContext
+from tortoise.backends.asyncpg.client import AsyncpgDBClient, TransactionWrapper
+
+
+class QueryStats:
+    """Number of database queries and total time spent on them"""
+
+    def __init__(self):
+        self.calls = 0
+        self.queries = 0
+        self.db_time = 0.0  # in seconds
+
+
+# stats of command which is being executed (None for background jobs)
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_stats", default=None)
+total_stats = QueryStats()
+command_stats: Dict[str, QueryStats] = {}
+
+
+def _time_queries(method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            for stats in (total_stats, _current_stats.get()):
+                if stats is not None:
+                    stats.queries += 1
+                    stats.db_time += elapsed
+
+    return wrapper
+
+
+def _get_command_name(ctx: SlashContext) -> str:
+    return "/" + " ".join(filter(None, [ctx.name, ctx.subcommand_group, ctx.subcommand_name]))
+
+
+def _track_command(invoke_command):
+    @functools.wraps(invoke_command)
+    async def wrapper(*args, **kwargs):
+        ctx = next((_ for _ in args if isinstance(_, SlashContext)), None)
+        if ctx is None:
+            return await invoke_command(*args, **kwargs)
+        command_name = _get_command_name(ctx)
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        try:
+            return await invoke_command(*args, **kwargs)
+        finally:
+            _current_stats.reset(token)
+            totals = command_stats.setdefault(command_name, QueryStats())
+            totals.calls += 1
+            totals.queries += stats.queries
+            totals.db_time += stats.db_time
+            logging.debug(f":::db: {command_name}: {stats.queries} queries in {stats.db_time * 1000:.1f} ms")
+
+    return wrapper
+
+
+def install_query_timing() -> None:
+    """Count queries and time spent on them, per slash command and in total (should be called once on startup)
+
+    Transactions inherit these methods from AsyncpgDBClient, except `execute_many` which TransactionWrapper overrides
+    """
+    for method_name in ("execute_insert", "execute_many", "execute_query", "execute_query_dict", "execute_script"):
+        setattr(AsyncpgDBClient, method_name, _time_queries(getattr(AsyncpgDBClient, method_name)))
+    TransactionWrapper.execute_many = _time_queries(TransactionWrapper.execute_many)
+    SlashCommand.invoke_command = _track_command(SlashCommand.invoke_command)
+
+
+def get_top_commands(limit: int) -> List[tuple]:
+    """Return commands which spent most time in database as list of (command name, stats)"""
+    return sorted(command_stats.items(), key=lambda _: _[1].db_time, reverse=True)[:limit]
@@ -0,0 +1,7 @@
+-- upgrade --
+ALTER TABLE "lottery" ADD "tickets_sold" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "lottery" ADD "pool_total" DECIMAL(15,2) NOT NULL  DEFAULT 0;
+UPDATE "lottery" SET "tickets_sold" = "t"."count", "pool_total" = "t"."count" * "lottery"."ticket_price" FROM (SELECT "lottery_id", COUNT(*) AS "count" FROM "ticket" GROUP BY "lottery_id") AS "t" WHERE "lottery"."id" = "t"."lottery_id";
+-- downgrade --
+ALTER TABLE "lottery" DROP COLUMN "tickets_sold";
+ALTER TABLE "lottery" DROP COLUMN "pool_total";
@@ -0,0 +1,9 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "blockhash" (
+    "block_number" BIGINT NOT NULL  PRIMARY KEY,
+    "hash" VARCHAR(66) NOT NULL,
+    "fetched_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "blockhash" IS 'Block hashes fetched from Etherscan (hash of the block with enough confirmations never changes)';
+-- downgrade --
+DROP TABLE IF EXISTS "blockhash";
@@ -0,0 +1,4 @@
+-- upgrade --
+CREATE INDEX IF NOT EXISTS "idx_ticket_lottery_934710" ON "ticket" ("lottery_id", "ticket_number");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_ticket_lottery_934710";
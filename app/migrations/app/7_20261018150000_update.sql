@@ -0,0 +1,15 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "lotteryresult" (
+    "id" UUID NOT NULL  PRIMARY KEY,
+    "winning_tickets" JSONB,
+    "winner_ids" JSONB NOT NULL,
+    "pool_paid" DECIMAL(15,2),
+    "winning_ticket_share" DECIMAL(15,2),
+    "block_hash" VARCHAR(66),
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "lottery_id" UUID NOT NULL UNIQUE REFERENCES "lottery" ("id") ON DELETE CASCADE
+);
+COMMENT ON TABLE "lotteryresult" IS 'Results of ended lotteries, they are written once when lottery ends';
+INSERT INTO "lotteryresult" ("id", "lottery_id", "winning_tickets", "winner_ids", "block_hash", "created_at") SELECT md5(random()::text || "lottery"."id"::text)::uuid, "lottery"."id", "lottery"."winning_tickets", COALESCE((SELECT jsonb_agg(DISTINCT "ticket"."user_id") FROM "ticket" WHERE "ticket"."lottery_id" = "lottery"."id" AND "lottery"."winning_tickets" @> to_jsonb("ticket"."ticket_number")), '[]'::jsonb), "blockhash"."hash", "lottery"."modified_at" FROM "lottery" LEFT JOIN "blockhash" ON "blockhash"."block_number" = "lottery"."strike_eth_block" WHERE "lottery"."status" = 'ended';
+-- downgrade --
+DROP TABLE IF EXISTS "lotteryresult";
@@ -0,0 +1,14 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "notification" (
+    "id" UUID NOT NULL  PRIMARY KEY,
+    "channel_id" BIGINT NOT NULL,
+    "content" TEXT,
+    "embed" JSONB,
+    "attempts" INT NOT NULL  DEFAULT 0,
+    "next_attempt_at" TIMESTAMPTZ,
+    "sent_at" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "notification" IS 'Outbox of channel messages, they are written in the same transaction as the change they announce';
+-- downgrade --
+DROP TABLE IF EXISTS "notification";
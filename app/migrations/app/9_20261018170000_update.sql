@@ -0,0 +1,11 @@
+-- upgrade --
+ALTER TABLE "lottery" ADD "vrf_version" SMALLINT NOT NULL  DEFAULT 1;
+ALTER TABLE "lottery" ALTER COLUMN "vrf_version" SET DEFAULT 2;
+ALTER TABLE "lottery" ALTER COLUMN "ticket_min_number" TYPE BIGINT USING "ticket_min_number"::BIGINT;
+ALTER TABLE "lottery" ALTER COLUMN "ticket_max_number" TYPE BIGINT USING "ticket_max_number"::BIGINT;
+ALTER TABLE "ticket" ALTER COLUMN "ticket_number" TYPE BIGINT USING "ticket_number"::BIGINT;
+-- downgrade --
+ALTER TABLE "lottery" DROP COLUMN "vrf_version";
+ALTER TABLE "lottery" ALTER COLUMN "ticket_min_number" TYPE INT USING "ticket_min_number"::INT;
+ALTER TABLE "lottery" ALTER COLUMN "ticket_max_number" TYPE INT USING "ticket_max_number"::INT;
+ALTER TABLE "ticket" ALTER COLUMN "ticket_number" TYPE INT USING "ticket_number"::INT;
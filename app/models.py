@@ -1,7 +1,7 @@
 from tortoise import fields
 from tortoise.models import Model
 
-from app.constants import LotteryStatus
+from app.constants import LotteryStatus, LATEST_VRF_VERSION
 from app.validators import PositiveValueValidator
 
 
@@ -43,20 +43,31 @@ class Lottery(Model):
     is_guaranteed = fields.BooleanField(default=False)
     # if True only people who has ROLES_CAN_CONTROL_BOT could buy tickets
     is_whitelisted = fields.BooleanField(default=False)
-    ticket_min_number = fields.IntField(default=10_000)
-    ticket_max_number = fields.IntField(default=99_000)
+    ticket_min_number = fields.BigIntField(default=10_000)
+    ticket_max_number = fields.BigIntField(default=99_000)
+    # version of algorithm used to select winning tickets, old lotteries keep their version so they still verify
+    vrf_version = fields.SmallIntField(default=LATEST_VRF_VERSION)
+    # denormalised counters, they are updated in the same transaction in which tickets are created
+    tickets_sold = fields.IntField(default=0)
+    pool_total = fields.data.DecimalField(max_digits=15, decimal_places=2, default=0)
     participants = fields.ManyToManyField("app.User", related_name="lotteries", through="ticket")
     created_at = fields.DatetimeField(auto_now_add=True)
     modified_at = fields.DatetimeField(auto_now=True)
 
     tickets: fields.ReverseRelation["Ticket"]
+    result: fields.ReverseRelation["LotteryResult"]
 
     def __str__(self):
         return self.name
 
     @property
-    def possible_tickets_count(self):
-        return len([_ for _ in range(self.ticket_min_number, self.ticket_max_number + 1)])
+    def possible_tickets_count(self) -> int:
+        # make range to behave as inclusive range, this way ticket with max_number could be won
+        return max(self.ticket_max_number + 1 - self.ticket_min_number, 0)
+
+    @property
+    def tickets_left(self) -> int:
+        return max(self.possible_tickets_count - self.tickets_sold, 0)
 
 
 class Ticket(Model):
@@ -65,7 +76,7 @@ class Ticket(Model):
     id = fields.UUIDField(pk=True)
     user = fields.ForeignKeyField("app.User", related_name="tickets")
     lottery = fields.ForeignKeyField("app.Lottery", related_name="tickets")
-    ticket_number = fields.IntField()
+    ticket_number = fields.BigIntField()
     created_at = fields.DatetimeField(auto_now_add=True)
     modified_at = fields.DatetimeField(auto_now=True)
 
@@ -76,3 +87,48 @@ class Ticket(Model):
 
     class Meta:
         unique_together = ("ticket_number", "lottery")
+        indexes = (("lottery", "ticket_number"),)
+
+
+class BlockHash(Model):
+    """Block hashes fetched from Etherscan (hash of the block with enough confirmations never changes)"""
+
+    block_number = fields.BigIntField(pk=True, generated=False)
+    hash = fields.CharField(max_length=66)
+    fetched_at = fields.DatetimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.block_number} ({self.hash})"
+
+
+class LotteryResult(Model):
+    """Results of ended lotteries, they are written once when lottery ends"""
+
+    id = fields.UUIDField(pk=True)
+    lottery = fields.OneToOneField("app.Lottery", related_name="result")
+    winning_tickets = fields.JSONField(null=True)
+    winner_ids = fields.JSONField(default=list)
+    # null for lotteries which ended before results were recorded (old winning pool paid to them is unknown)
+    pool_paid = fields.data.DecimalField(max_digits=15, decimal_places=2, null=True)
+    winning_ticket_share = fields.data.DecimalField(max_digits=15, decimal_places=2, null=True)
+    block_hash = fields.CharField(max_length=66, null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.id} ({self.lottery_id})"
+
+
+class Notification(Model):
+    """Outbox of channel messages, they are written in the same transaction as the change they announce"""
+
+    id = fields.UUIDField(pk=True)
+    channel_id = fields.BigIntField()
+    content = fields.TextField(null=True)
+    embed = fields.JSONField(null=True)  # serialized via discord.Embed.to_dict
+    attempts = fields.IntField(default=0)
+    next_attempt_at = fields.DatetimeField(null=True)  # null if notification could be delivered right away
+    sent_at = fields.DatetimeField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.id} ({self.channel_id})"
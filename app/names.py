@@ -0,0 +1,63 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from app.models import Lottery
+from app.constants import LotteryStatus
+
+
+class LotteryNameIndex:
+    """In-memory index of lottery names for lookups by name or by its beginning (case insensitive)
+
+    Names are kept sorted by their casefolded form, so prefix search is a binary search instead of a database query
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []  # sorted casefolded names
+        self._names: Dict[str, str] = {}  # casefolded name -> name
+        self._statuses: Dict[str, LotteryStatus] = {}  # casefolded name -> status
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    async def load(self) -> None:
+        """(Re)build index from database"""
+        lotteries = await Lottery.all().values_list("name", "status")
+        self._keys = sorted(name.casefold() for name, _ in lotteries)
+        self._names = {name.casefold(): name for name, _ in lotteries}
+        self._statuses = {name.casefold(): LotteryStatus(status) for name, status in lotteries}
+
+    def add(self, name: str, status: LotteryStatus = LotteryStatus.STARTED) -> None:
+        key = name.casefold()
+        if key not in self._names:
+            insort(self._keys, key)
+        self._names[key] = name
+        self._statuses[key] = status
+
+    def search(self, prefix: str, only_started: bool = False) -> List[str]:
+        """Return names which start with prefix"""
+        prefix = prefix.casefold()
+        names = []
+        for key in self._keys[bisect_left(self._keys, prefix) :]:
+            if not key.startswith(prefix):
+                break
+            if not only_started or self._statuses[key] == LotteryStatus.STARTED:
+                names.append(self._names[key])
+        return names
+
+    def resolve(self, query: str, only_started: bool = False) -> Tuple[Optional[str], List[str]]:
+        """Resolve user input to lottery name
+
+        Exact (case insensitive) match always wins, otherwise query is treated as the beginning of the name
+
+        Returns:
+            lottery name (or None if it is ambiguous or unknown) and list of matching names
+        """
+        query = query.strip()
+        name = self._names.get(query.casefold())
+        if name:
+            return name, [name]
+        names = self.search(query, only_started=only_started)
+        return (names[0] if len(names) == 1 else None), names
+
+
+lottery_names = LotteryNameIndex()
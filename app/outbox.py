@@ -0,0 +1,36 @@
+import asyncio
+from typing import Optional
+
+from discord import Embed
+
+from app.models import Notification
+
+
+# set when new notifications were committed, dispatcher will deliver them right away
+_outbox_event: Optional[asyncio.Event] = None
+
+
+def _get_outbox_event() -> asyncio.Event:
+    global _outbox_event
+    if _outbox_event is None:
+        _outbox_event = asyncio.Event()
+    return _outbox_event
+
+
+async def enqueue_notification(channel_id: int, content: Optional[str] = None, embed: Optional[Embed] = None) -> None:
+    """Add message to outbox (runs inside current transaction if any), call `wake_dispatcher` after commit"""
+    await Notification.create(channel_id=channel_id, content=content, embed=embed.to_dict() if embed else None)
+
+
+def wake_dispatcher() -> None:
+    _get_outbox_event().set()
+
+
+async def wait_for_notifications(timeout: float) -> None:
+    """Sleep until new notifications are committed or until timeout"""
+    outbox_event = _get_outbox_event()
+    try:
+        await asyncio.wait_for(outbox_event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    outbox_event.clear()
@@ -0,0 +1,100 @@
+import heapq
+import asyncio
+import datetime
+from uuid import UUID
+from typing import Dict, List, Optional, Tuple
+
+from tortoise import timezone
+
+from app.models import Lottery
+from app.constants import (
+    LotteryStatus,
+    STOP_SALES_BEFORE_START_IN_SEC,
+    BLOCK_CONFIRMATIONS,
+    AVERAGE_BLOCK_TIME_SECONDS,
+)
+
+
+def get_lottery_deadline(lottery: Lottery, retry_after: float) -> Optional[datetime.datetime]:
+    """Return time at which lottery status should be checked next time (None if lottery doesn't need checks)
+
+    Strike date is only an estimate, so if lottery is late we will check it again after `retry_after` seconds
+    """
+    now = timezone.now()
+    if lottery.status == LotteryStatus.STARTED:
+        deadline = lottery.strike_date_eta - datetime.timedelta(seconds=STOP_SALES_BEFORE_START_IN_SEC)
+    elif lottery.status == LotteryStatus.STOP_SALES:
+        # expected time at which strike block will have required number of confirmations
+        deadline = lottery.strike_date_eta + datetime.timedelta(
+            seconds=BLOCK_CONFIRMATIONS * AVERAGE_BLOCK_TIME_SECONDS
+        )
+        if deadline <= now:
+            deadline = now + datetime.timedelta(seconds=retry_after)
+    elif lottery.status == LotteryStatus.STRIKED:
+        deadline = now
+    else:
+        return None
+    return deadline
+
+
+class LotteryScheduler:
+    """Min-heap of next deadlines per lottery, allows to sleep until the earliest deadline
+
+    Only the earliest deadline per lottery is kept, stale heap entries are skipped when they reach the top
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime.datetime, UUID]] = []
+        self._deadlines: Dict[UUID, datetime.datetime] = {}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, lottery_id: UUID, deadline: datetime.datetime) -> None:
+        """Arm deadline for lottery, waiting job will be woken up if deadline is earlier than current one"""
+        current_deadline = self._deadlines.get(lottery_id)
+        if current_deadline is not None and current_deadline <= deadline:
+            return None
+        self._deadlines[lottery_id] = deadline
+        heapq.heappush(self._heap, (deadline, lottery_id))
+        self._wakeup.set()
+        return None
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def next_deadline(self) -> Optional[datetime.datetime]:
+        while self._heap:
+            deadline, lottery_id = self._heap[0]
+            if self._deadlines.get(lottery_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self) -> List[UUID]:
+        """Remove and return ids of lotteries which deadlines have passed"""
+        now = timezone.now()
+        lottery_ids = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                return lottery_ids
+            _, lottery_id = heapq.heappop(self._heap)
+            del self._deadlines[lottery_id]
+            lottery_ids.append(lottery_id)
+
+    async def wait(self) -> List[UUID]:
+        """Sleep until the earliest deadline (or forever if nothing is scheduled) and return due lotteries ids"""
+        while True:
+            lottery_ids = self.pop_due()
+            if lottery_ids:
+                return lottery_ids
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max((deadline - timezone.now()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
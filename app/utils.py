@@ -1,19 +1,22 @@
 import random
-from typing import List
+import hashlib
+import itertools
+from uuid import UUID
 from decimal import Decimal
-from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from typing import Dict, List, Iterable, Iterator, Optional
 
-import aiohttp
 import sentry_sdk
-from tortoise.functions import Count
+from tortoise import Tortoise
 from tortoise.query_utils import Q
+from tortoise.transactions import get_connection
 from discord.ext import commands
-from discord_slash.utils.manage_commands import create_option, create_choice
+from discord_slash import SlashContext
 
-import config
-from app.models import User, Lottery
-from app.constants import LotteryStatus
-from app.exceptions import BlockAlreadyMinedException
+from app.models import Lottery, Ticket, BlockHash
+from app.names import lottery_names
+from app.etherscan import etherscan
+from app.constants import LotteryStatus, DELETE_AFTER, NUMBER_OF_SUGGESTIONS, REGISTERED_USERS_CACHE_SIZE
 
 
 def use_sentry(client, **sentry_args):
@@ -58,173 +61,133 @@ def pp_points(balance: Decimal) -> str:
         return str_balance[:]
 
 
-async def ensure_registered(user_id: int) -> User:
-    """Ensure that user is registered in our database"""
-
-    user, _ = await User.get_or_create(id=user_id)
-    return user
+# ids of users which are known to be registered (least recently used ids are evicted first)
+_registered_user_ids: "OrderedDict[int, None]" = OrderedDict()
 
 
-async def get_eta_to_block(block: int) -> datetime:
-    """Get ETA to block
+async def ensure_registered(user_id: int) -> None:
+    """Ensure that user is registered in our database"""
+    await ensure_registered_bulk([user_id])
+
+
+async def ensure_registered_bulk(user_ids: Iterable[int]) -> None:
+    """Ensure that all users are registered in our database using single query"""
+    unknown_user_ids = []
+    for user_id in set(user_ids):
+        if user_id in _registered_user_ids:
+            _registered_user_ids.move_to_end(user_id)
+        else:
+            unknown_user_ids.append(user_id)
+    if unknown_user_ids:
+        # use connection from the pool instead of current transaction, this way registration is committed right away
+        # and cached ids can't point to rows which were rolled back
+        await Tortoise.get_connection("default").execute_query(
+            'INSERT INTO "user" ("id") SELECT unnest($1::bigint[]) ON CONFLICT DO NOTHING', [unknown_user_ids]
+        )
+        for user_id in unknown_user_ids:
+            _registered_user_ids[user_id] = None
+        while len(_registered_user_ids) > REGISTERED_USERS_CACHE_SIZE:
+            _registered_user_ids.popitem(last=False)
+
+
+async def resolve_lottery_name(ctx: SlashContext, name: str, only_started: bool = False) -> Optional[str]:
+    """Resolve sweepstake name typed by user (full name or its beginning)
 
-    Raises: BlockAlreadyMinedException if block already passed
+    Returns:
+        sweepstake name or None if name is ambiguous (in this case user will get suggestions)
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            f"https://api.etherscan.io/api?module=block&action=getblockcountdown&blockno={block}&apikey={config.ETHERSCAN_API_KEY}"  # noqa: E501
-        ) as response:
-            try:
-                response_json = await response.json()
-                eta_in_seconds = int(float(response_json["result"]["EstimateTimeInSec"]))
-                strike_date_eta = datetime.now(tz=timezone.utc) + timedelta(seconds=eta_in_seconds)
-                return strike_date_eta
-            except TypeError:
-                raise BlockAlreadyMinedException()
+    lottery_name, names = lottery_names.resolve(name, only_started=only_started)
+    if lottery_name:
+        return lottery_name
+    if not names:
+        # let command handle unknown sweepstake
+        return name
+    suggestions = ", ".join([f"`{_}`" for _ in names[:NUMBER_OF_SUGGESTIONS]])
+    await ctx.send(
+        f"{ctx.author.mention}, there are several sweepstakes starting with `{name}`, did you mean: {suggestions}?",
+        delete_after=DELETE_AFTER,
+    )
+    return None
 
 
 async def get_hash_for_block(block: int) -> str:
-    """Function which will get block hash for block
+    """Return block hash, it is fetched from Etherscan only once and then stored in database
 
-    Returns:
-        block hash
+    Note: block should have required number of confirmations, otherwise its hash could still change
     """
-    async with aiohttp.ClientSession() as session:
-        block_hex = hex(block)
-        async with session.get(
-            f"https://api.etherscan.io/api?module=proxy&action=eth_getBlockByNumber&tag={block_hex}&boolean=true&apikey={config.ETHERSCAN_API_KEY}"  # noqa: E501
-        ) as response:
-            block_info = await response.json()
-            return block_info["result"]["hash"]
+    block_hash = await BlockHash.get_or_none(block_number=block)
+    if block_hash:
+        return block_hash.hash
+    hash = await etherscan.get_hash_for_block(block)
+    await get_connection("default").execute_query(
+        'INSERT INTO "blockhash" ("block_number", "hash") VALUES ($1, $2) ON CONFLICT DO NOTHING', [block, hash]
+    )
+    return hash
 
 
-async def get_old_winning_pool() -> int:
+async def get_old_winning_pool() -> Decimal:
     """Return winning pool for past lotteries without winners (aka with 'ended' status and has_winners="False")"""
-    qs = (
-        await Lottery.filter(Q(status=LotteryStatus.ENDED) & Q(has_winners=False))
-        .prefetch_related("tickets")
-        .annotate(total_tickets=Count("tickets"))
-    )
-    # TODO: waiting for response to rewrite this into orm
-    # https://github.com/tortoise/tortoise-orm/issues/683
-    return sum([_.total_tickets * _.ticket_price for _ in qs])
-
-
-async def register_view_lottery_command(bot, cmd) -> None:
-    """Dirty hack to register options on fly for view_lottery command"""
-    lotteries = await Lottery.all().order_by("-created_at").limit(10)
-    try:
-        # force sync_commands to detect new changes and sync slash commands with Discord
-        del bot.slash.subcommands["sweepstake"]["view"]
-    except KeyError:
-        pass
-    bot.slash.add_subcommand(
-        cmd=cmd,
-        base="sweepstake",
-        name="view",
-        description="Display sweepstake information",
-        guild_ids=config.GUILD_IDS,
-        options=[
-            create_option(
-                name="name",
-                description="choose sweepstake",
-                option_type=3,
-                required=True,
-                choices=[create_choice(name=_.name, value=_.name) for _ in lotteries],
-            )
-        ],
+    # runs inside current transaction if any
+    rows = await get_connection("default").execute_query_dict(
+        'SELECT COALESCE(SUM("pool_total"), 0) AS "pool" FROM "lottery" WHERE "status" = $1 AND NOT "has_winners"',
+        [LotteryStatus.ENDED.value],
     )
-    return None
+    return rows[0]["pool"]
 
 
-async def register_buy_ticket_command(bot, cmd) -> None:
-    """Dirty hack to register options on fly for buy_ticket command"""
-    lotteries = await Lottery.filter(status=LotteryStatus.STARTED).order_by("-created_at").limit(10)
-    try:
-        # force sync_commands to detect new changes and sync slash commands with Discord
-        del bot.slash.subcommands["sweepstake"]["buy"]
-    except KeyError:
-        pass
-    bot.slash.add_subcommand(
-        cmd=cmd,
-        base="sweepstake",
-        name="buy",
-        description="Buy ticket",
-        guild_ids=config.GUILD_IDS,
-        options=[
-            create_option(
-                name="name",
-                description="choose sweepstake",
-                option_type=3,
-                required=True,
-                choices=[create_choice(name=_.name, value=_.name) for _ in lotteries],
-            )
-        ],
-    )
-    return None
-
+async def get_winning_tickets(lotteries: List[Lottery]) -> Dict[UUID, List[Ticket]]:
+    """Return winning tickets grouped by lottery id, only winning tickets are fetched from database"""
+    conditions = [Q(lottery_id=_.id, ticket_number__in=_.winning_tickets) for _ in lotteries if _.winning_tickets]
+    winning_tickets = {_.id: [] for _ in lotteries}
+    if conditions:
+        for ticket in await Ticket.filter(Q(*conditions, join_type=Q.OR)).order_by("created_at"):
+            winning_tickets[ticket.lottery_id].append(ticket)
+    return winning_tickets
 
-async def register_buy_whitelisted_command(bot, cmd) -> None:
-    """Dirty hack to register options on fly for buy_whitelisted command"""
-    lotteries = await Lottery.filter(status=LotteryStatus.STARTED).order_by("-created_at").limit(10)
-    try:
-        # force sync_commands to detect new changes and sync slash commands with Discord
-        del bot.slash.subcommands["sweepstake_admin"]["buy_whitelisted"]
-    except KeyError:
-        pass
-    bot.slash.add_subcommand(
-        cmd=cmd,
-        base="sweepstake_admin",
-        name="buy_whitelisted",
-        description="Batch Buy Whitelisted tickets (admins only)",
-        guild_ids=config.GUILD_IDS,
-        options=[
-            create_option(
-                name="name",
-                description="choose sweepstake",
-                option_type=3,
-                required=True,
-                choices=[create_choice(name=_.name, value=_.name) for _ in lotteries],
-            )
-        ],
-    )
-    return None
 
+async def get_ticket_numbers_by_rank(lottery_id: UUID, ranks: List[int]) -> List[int]:
+    """Return ticket numbers of lottery at given positions of tickets sorted by ticket number (in order of ranks)
 
-async def register_my_tickets_command(bot, cmd) -> None:
-    """Dirty hack to register options on fly for my_tickets command"""
-    lotteries = await Lottery.all().order_by("-created_at").limit(10)
-    try:
-        # force sync_commands to detect new changes and sync slash commands with Discord
-        del bot.slash.subcommands["sweepstake"]["tickets"]
-    except KeyError:
-        pass
-    bot.slash.add_subcommand(
-        cmd=cmd,
-        base="sweepstake",
-        name="tickets",
-        description="My tickets",
-        guild_ids=config.GUILD_IDS,
-        options=[
-            create_option(
-                name="name",
-                description="choose sweepstake",
-                option_type=3,
-                required=True,
-                choices=[create_choice(name=_.name, value=_.name) for _ in lotteries],
-            )
-        ],
+    Tickets are ranked in database, so all tickets of lottery aren't loaded (runs inside current transaction if any)
+    """
+    rows = await get_connection("default").execute_query_dict(
+        'SELECT "rank", "ticket_number" FROM (SELECT "ticket_number", '
+        'row_number() OVER (ORDER BY "ticket_number") - 1 AS "rank" FROM "ticket" WHERE "lottery_id" = $1) AS "t" '
+        'WHERE "rank" = ANY($2::bigint[])',
+        [lottery_id, list(ranks)],
+    )
+    ticket_numbers = {_["rank"]: _["ticket_number"] for _ in rows}
+    return [ticket_numbers[_] for _ in ranks]
+
+
+async def credit_balances(amounts: Dict[int, Decimal]) -> None:
+    """Add amounts to balances of users using single query (runs inside current transaction if any)"""
+    amounts = {user_id: amount for user_id, amount in amounts.items() if amount}
+    if not amounts:
+        return None
+    await get_connection("default").execute_query(
+        'UPDATE "user" SET "balance" = "user"."balance" + "p"."amount" '
+        'FROM unnest($1::bigint[], $2::numeric[]) AS "p" ("id", "amount") WHERE "user"."id" = "p"."id"',
+        [list(amounts.keys()), [Decimal(_) for _ in amounts.values()]],
     )
     return None
 
 
-async def reload_options_hack(bot) -> None:
-    """dirty hack to fake dynamic loading of choices in slash commands"""
-    await register_view_lottery_command(bot, bot.cogs["LotteryCog"].view_lottery)
-    await register_buy_ticket_command(bot, bot.cogs["TicketCog"].buy_ticket)
-    await register_buy_whitelisted_command(bot, bot.cogs["TicketCog"].buy_whitelisted)
-    await register_my_tickets_command(bot, bot.cogs["TicketCog"].my_tickets)
-    bot.reload_extension("app.extensions.lottery")
+async def reconcile_lottery_counters() -> int:
+    """Recompute denormalised `tickets_sold` and `pool_total` counters from tickets
+
+    Returns:
+        number of lotteries which had wrong counters
+    """
+    rows_affected, _ = await get_connection("default").execute_query(
+        'UPDATE "lottery" SET "tickets_sold" = "t"."count", "pool_total" = "t"."pool" '
+        'FROM (SELECT "lottery"."id", COUNT("ticket"."id") AS "count", '
+        'COUNT("ticket"."id") * "lottery"."ticket_price" AS "pool" FROM "lottery" '
+        'LEFT JOIN "ticket" ON "ticket"."lottery_id" = "lottery"."id" GROUP BY "lottery"."id") AS "t" '
+        'WHERE "lottery"."id" = "t"."id" '
+        'AND ("lottery"."tickets_sold", "lottery"."pool_total") <> ("t"."count", "t"."pool")'
+    )
+    return rows_affected
 
 
 def select_winning_tickets(
@@ -277,3 +240,90 @@ def select_winning_tickets_guaranteed(
         return vrf_random.sample(ticket_numbers, number_of_winning_tickets)
     else:
         return ticket_numbers
+
+
+def select_winning_indices(hash: str, population_size: int, number_of_winning_tickets: int = 1) -> List[int]:
+    """Select distinct indices from range(population_size) using block hash (VRF version 1)
+
+    `select_winning_tickets_guaranteed(hash, ticket_numbers, k)` selects `ticket_numbers[i]` for these indices,
+    because `random.sample` accesses population only by index
+    """
+    vrf_random = random.Random(hash)
+    return vrf_random.sample(range(population_size), number_of_winning_tickets)
+
+
+def _hash_stream(hash: str) -> Iterator[int]:
+    """Yield 256-bit integers `sha256(f"{hash}:{i}")` (big-endian) for i = 0, 1, 2, ..."""
+    for i in itertools.count():
+        yield int.from_bytes(hashlib.sha256(f"{hash}:{i}".encode()).digest(), "big")
+
+
+def _randbelow(stream: Iterator[int], n: int) -> int:
+    """Return integer in [0, n), values which would cause modulo bias are rejected"""
+    limit = 2 ** 256 - 2 ** 256 % n
+    for value in stream:
+        if value < limit:
+            return value % n
+
+
+def select_winning_indices_v2(hash: str, population_size: int, number_of_winning_tickets: int = 1) -> List[int]:
+    """Select distinct indices from range(population_size) using block hash (VRF version 2)
+
+    Robert Floyd's sampling algorithm is used, so selection costs O(number_of_winning_tickets) time and memory
+    independent of population size (see README for the specification)
+    """
+    if not 0 <= number_of_winning_tickets <= population_size:
+        raise ValueError("Sample larger than population or is negative")
+    stream = _hash_stream(hash)
+    selected = {}  # ordered set
+    for j in range(population_size - number_of_winning_tickets, population_size):
+        index = _randbelow(stream, j + 1)
+        selected[j if index in selected else index] = None
+    return list(selected)
+
+
+def select_winning_tickets_v2(
+    hash: str,
+    min_number: int,
+    max_number: int,
+    number_of_winning_tickets: int = 1,
+) -> List[int]:
+    """Same as `select_winning_tickets`, but numbers are derived directly from block hash (VRF version 2)"""
+    # make range to behave as inclusive range, this way ticket with max_number could be won
+    indices = select_winning_indices_v2(hash, max_number + 1 - min_number, number_of_winning_tickets)
+    return [min_number + _ for _ in indices]
+
+
+def select_winning_tickets_guaranteed_v2(
+    hash: str,
+    ticket_numbers: list,
+    number_of_winning_tickets: int = 1,
+) -> List[int]:
+    """Same as `select_winning_tickets_guaranteed`, but tickets are selected from ticket numbers sorted in
+    ascending order by indices derived directly from block hash (VRF version 2)
+    """
+    if len(ticket_numbers) <= number_of_winning_tickets:
+        return list(ticket_numbers)
+    ticket_numbers = sorted(ticket_numbers)
+    indices = select_winning_indices_v2(hash, len(ticket_numbers), number_of_winning_tickets)
+    return [ticket_numbers[_] for _ in indices]
+
+
+# winning tickets selection algorithms by VRF version (lottery.vrf_version)
+SELECT_WINNING_TICKETS = {1: select_winning_tickets, 2: select_winning_tickets_v2}
+SELECT_WINNING_TICKETS_GUARANTEED = {1: select_winning_tickets_guaranteed, 2: select_winning_tickets_guaranteed_v2}
+SELECT_WINNING_INDICES = {1: select_winning_indices, 2: select_winning_indices_v2}
+
+
+async def select_winning_tickets_for_guaranteed_lottery(lottery: Lottery, hash: str) -> List[int]:
+    """Select winning tickets of guaranteed lottery from its tickets sorted by ticket number
+
+    Only number of tickets and winning tickets are fetched from database (runs inside current transaction if any)
+    """
+    tickets_count = await Ticket.filter(lottery_id=lottery.id).count()
+    if tickets_count <= lottery.number_of_winning_tickets:
+        # every ticket wins
+        ranks = list(range(tickets_count))
+    else:
+        ranks = SELECT_WINNING_INDICES[lottery.vrf_version](hash, tickets_count, lottery.number_of_winning_tickets)
+    return await get_ticket_numbers_by_rank(lottery.id, ranks)
@@ -0,0 +1,174 @@
+"""Recompute winning tickets of past lotteries and compare them with stored ones
+
+Usage:
+    python -m app.verify                          # lotteries and block hashes are read from database
+    python -m app.verify --export dump.json       # export lotteries and block hashes for offline verification
+    python -m app.verify --dump dump.json         # verify exported lotteries (database isn't needed)
+    python -m app.verify --hashes hashes.json     # take block hashes from {"block number": "hash"} file
+    python -m app.verify --fetch-missing          # fetch hashes missing in database from Etherscan (and cache them)
+"""
+import sys
+import json
+import asyncio
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from tortoise import Tortoise
+
+from constants import TORTOISE_ORM
+from app.models import Lottery, Ticket, BlockHash
+from app.etherscan import etherscan
+from app.utils import SELECT_WINNING_TICKETS, SELECT_WINNING_TICKETS_GUARANTEED, get_hash_for_block
+from app.constants import LotteryStatus
+
+
+OK = "ok"
+MISMATCH = "mismatch"
+MISSING_HASH = "missing hash"
+# order of tickets which was used for draw of guaranteed lotteries with VRF version 1 isn't stored, so we could only
+# check that winning tickets were sold and that number of winning tickets is correct
+PARTIAL = "partial"
+
+
+async def load_from_database(fetch_missing: bool = False) -> Tuple[List[dict], Dict[str, str]]:
+    """Return struck and ended lotteries (with ticket numbers of guaranteed lotteries) and cached block hashes
+
+    If `fetch_missing` is True hashes which aren't cached yet are fetched from Etherscan and stored in database
+    """
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        lotteries = await Lottery.filter(status__in=[LotteryStatus.STRIKED, LotteryStatus.ENDED]).values(
+            "id",
+            "name",
+            "strike_eth_block",
+            "is_guaranteed",
+            "ticket_min_number",
+            "ticket_max_number",
+            "number_of_winning_tickets",
+            "winning_tickets",
+            "vrf_version",
+        )
+        guaranteed_ids = [_["id"] for _ in lotteries if _["is_guaranteed"]]
+        ticket_numbers = defaultdict(list)
+        if guaranteed_ids:
+            for lottery_id, ticket_number in await Ticket.filter(lottery_id__in=guaranteed_ids).values_list(
+                "lottery_id", "ticket_number"
+            ):
+                ticket_numbers[lottery_id].append(ticket_number)
+        block_hashes = await BlockHash.filter(
+            block_number__in=[_["strike_eth_block"] for _ in lotteries]
+        ).values_list("block_number", "hash")
+        block_hashes = dict(block_hashes)
+        if fetch_missing:
+            await etherscan.start()
+            try:
+                # blocks of struck lotteries have required number of confirmations, so their hashes won't change
+                for block in {_["strike_eth_block"] for _ in lotteries} - block_hashes.keys():
+                    try:
+                        block_hashes[block] = await get_hash_for_block(block)
+                    except Exception as e:
+                        # lotteries with this block will be reported as missing hash
+                        print(f"Failed to fetch hash for block {block}: {e}", file=sys.stderr)
+            finally:
+                await etherscan.close()
+    finally:
+        await Tortoise.close_connections()
+    for lottery in lotteries:
+        lottery["ticket_numbers"] = sorted(ticket_numbers[lottery["id"]]) if lottery["is_guaranteed"] else None
+        lottery["id"] = str(lottery["id"])
+    return lotteries, {str(block): hash for block, hash in block_hashes.items()}
+
+
+def verify_lottery(lottery: dict, block_hash: Optional[str]) -> Tuple[str, Optional[List[int]]]:
+    """Recompute winning tickets of lottery
+
+    Returns:
+        verification status and recomputed winning tickets
+    """
+    if block_hash is None:
+        return MISSING_HASH, None
+    winning_tickets = sorted(lottery["winning_tickets"] or [])
+    # lotteries exported before VRF was versioned use version 1
+    vrf_version = lottery.get("vrf_version", 1)
+    if lottery["is_guaranteed"] and vrf_version == 1:
+        ticket_numbers = set(lottery["ticket_numbers"])
+        expected_count = min(lottery["number_of_winning_tickets"], len(ticket_numbers))
+        is_valid = set(winning_tickets) <= ticket_numbers and len(set(winning_tickets)) == expected_count
+        return (PARTIAL if is_valid else MISMATCH), None
+    if lottery["is_guaranteed"]:
+        expected = SELECT_WINNING_TICKETS_GUARANTEED[vrf_version](
+            hash=block_hash,
+            ticket_numbers=lottery["ticket_numbers"],
+            number_of_winning_tickets=lottery["number_of_winning_tickets"],
+        )
+    else:
+        expected = SELECT_WINNING_TICKETS[vrf_version](
+            hash=block_hash,
+            min_number=lottery["ticket_min_number"],
+            max_number=lottery["ticket_max_number"],
+            number_of_winning_tickets=lottery["number_of_winning_tickets"],
+        )
+    expected = sorted(expected)
+    return (OK if expected == winning_tickets else MISMATCH), expected
+
+
+def _verify_lottery(args: Tuple[dict, Optional[str]]) -> Tuple[str, Optional[List[int]]]:
+    return verify_lottery(*args)
+
+
+def verify_lotteries(
+    lotteries: List[dict], block_hashes: Dict[str, str], workers: Optional[int] = None
+) -> List[Tuple[str, Optional[List[int]]]]:
+    """Verify lotteries in parallel using process pool, results are returned in the same order as lotteries"""
+    tasks = [(_, block_hashes.get(str(_["strike_eth_block"]))) for _ in lotteries]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_verify_lottery, tasks, chunksize=max(len(tasks) // 64, 1)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify winning tickets of past sweepstakes")
+    parser.add_argument("--dump", help="verify lotteries from JSON file created via --export instead of database")
+    parser.add_argument("--hashes", help='JSON file with block hashes {"block number": "hash"}, used as local stub')
+    parser.add_argument(
+        "--fetch-missing",
+        action="store_true",
+        help="fetch block hashes missing in database from Etherscan, they are cached in database",
+    )
+    parser.add_argument("--export", help="export lotteries and block hashes to JSON file and exit")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default CPU count)")
+    args = parser.parse_args(argv)
+    if args.dump and args.fetch_missing:
+        parser.error("--fetch-missing can't be used with --dump, hashes are fetched only in database mode")
+
+    if args.dump:
+        with open(args.dump) as f:
+            dump = json.load(f)
+        lotteries, block_hashes = dump["lotteries"], dump["hashes"]
+    else:
+        lotteries, block_hashes = asyncio.run(load_from_database(fetch_missing=args.fetch_missing))
+    if args.hashes:
+        with open(args.hashes) as f:
+            block_hashes.update({str(block): hash for block, hash in json.load(f).items()})
+    if args.export:
+        with open(args.export, "w") as f:
+            json.dump({"lotteries": lotteries, "hashes": block_hashes}, f, indent=2)
+        print(f"Exported {len(lotteries)} lotteries to {args.export}")
+        return 0
+
+    statuses = defaultdict(int)
+    for lottery, (status, expected) in zip(lotteries, verify_lotteries(lotteries, block_hashes, args.workers)):
+        statuses[status] += 1
+        if status == MISMATCH and expected is None:
+            print(f"{lottery['name']}: stored {lottery['winning_tickets']} don't match sold tickets")
+        elif status == MISMATCH:
+            print(f"{lottery['name']}: stored {lottery['winning_tickets']}, expected {expected}")
+        elif status == MISSING_HASH:
+            print(f"{lottery['name']}: hash for block {lottery['strike_eth_block']} is unknown")
+    print(", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())) or "Nothing to verify")
+    return 1 if statuses[MISMATCH] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""Micro-benchmark for Lottery.possible_tickets_count and Lottery.tickets_left
+
+They should take constant time independent of the range of ticket numbers (up to 10^9 numbers)
+
+Usage:
+    python -m benchmarks.ticket_counts
+"""
+import timeit
+
+from app.models import Lottery
+
+
+NUMBER_OF_CALLS = 100_000
+# calls for huge range may be a bit slower because of big integers, but not proportionally to the range
+MAX_SLOWDOWN = 3
+
+
+def time_properties(ticket_min_number: int, ticket_max_number: int) -> float:
+    """Return time in seconds of NUMBER_OF_CALLS calls of both properties"""
+    lottery = Lottery(ticket_min_number=ticket_min_number, ticket_max_number=ticket_max_number, tickets_sold=10)
+    return timeit.timeit(lambda: (lottery.possible_tickets_count, lottery.tickets_left), number=NUMBER_OF_CALLS)
+
+
+def main() -> None:
+    small_range_time = min(time_properties(1, 1_000) for _ in range(5))
+    huge_range_time = min(time_properties(1, 10 ** 9) for _ in range(5))
+    print(f"range 10^3: {small_range_time / NUMBER_OF_CALLS * 10 ** 9:.0f} ns per call")
+    print(f"range 10^9: {huge_range_time / NUMBER_OF_CALLS * 10 ** 9:.0f} ns per call")
+    assert huge_range_time < small_range_time * MAX_SLOWDOWN, "ticket counts aren't constant-time"
+
+
+if __name__ == "__main__":
+    main()
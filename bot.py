@@ -10,6 +10,16 @@ from discord_slash import SlashCommand
 import config
 from constants import SENTRY_ENV_NAME, TORTOISE_ORM
 from app.utils import use_sentry
+from app.names import lottery_names
+from app.etherscan import etherscan
+from app.instrumentation import install_query_timing
+
+
+class SweepstakeBot(commands.Bot):
+    async def close(self):
+        # release long-lived HTTP connections before shutting down
+        await etherscan.close()
+        await super().close()
 
 
 if __name__ == "__main__":
@@ -17,8 +27,8 @@ if __name__ == "__main__":
     intents = Intents.default()
     intents.members = True
     activity = Activity(type=ActivityType.playing, name=f"{config.PROJECT_NAME} sweepstake")
-    bot = commands.Bot(command_prefix="!sweepstake.", help_command=None, intents=intents, activity=activity)
-    SlashCommand(bot, sync_commands=True, sync_on_cog_reload=True, override_type=True)
+    bot = SweepstakeBot(command_prefix="!sweepstake.", help_command=None, intents=intents, activity=activity)
+    SlashCommand(bot, sync_commands=True, override_type=True)
 
     # init sentry SDK
     use_sentry(
@@ -37,9 +47,13 @@ if __name__ == "__main__":
         format="%(asctime)s %(levelname)s:%(message)s",
         handlers=[file_handler if config.LOG_TO_FILE else stdout_handler],
     )
+    install_query_timing()
     bot.loop.run_until_complete(Tortoise.init(config=TORTOISE_ORM))
+    bot.loop.run_until_complete(etherscan.start())
+    bot.loop.run_until_complete(lottery_names.load())
     bot.load_extension("app.extensions.lottery")
     bot.load_extension("app.extensions.tickets")
     bot.load_extension("app.extensions.wallet")
     bot.load_extension("app.extensions.common")
+    bot.load_extension("app.extensions.notifications")
     bot.run(config.TOKEN)
@@ -4,7 +4,10 @@ SENTRY_API_KEY = ""
 LOTTERY_CHANNEL_ID = 42424242
 ACCOUNTANT_BOT_IDS = [42424242]
 ETHERSCAN_API_KEY = "xxxxxxxxxxx"
-CHECK_LOTTERY_STATUS_SECONDS = 60  # don't set to less than 18 seconds due to API rate limits
+ETHERSCAN_API_URL = "https://api.etherscan.io/api"  # could be pointed to a local stub server
+ETHERSCAN_TIMEOUT_SECONDS = 10
+ETHERSCAN_RATE_LIMIT = 5  # max number of requests per second to Etherscan API (5 for free API keys)
+CHECK_LOTTERY_STATUS_SECONDS = 60  # how often late sweepstakes (strike block not confirmed yet) are re-checked
 LOG_LEVEL = "INFO"
 # should the bot log to file or to stdout
 LOG_TO_FILE = True